@@ -1,55 +1,159 @@
+import decimal
+import functools
 import re
 from beancount.core.number import D
 from beancount.core.amount import Amount
 
+_PAREN_RE = re.compile(r'\((.*)\)')
+_SIGN_RE = re.compile(r'[-+](.*)')
+# Matches a complete (stripped) amount in a single pass: an optional sign or
+# enclosing parentheses denoting a negative amount, followed by the number
+# with an optional currency before or after it.
+#
+# Each optional element consumes its own trailing whitespace, so that a run of
+# whitespace can only be matched one way and a failed match takes linear time.
+_AMOUNT_RE = re.compile(r'(?:([-+])|(\())?\s*(?:[(][^)]+[)]\s*)?(?:([\$€£]|[A-Z]{3})\s*)?((?:[0-9](?:,?[0-9])*|(?=\.))(?:\.[0-9]+)?)(?:\s+([\$€£]|[A-Z]{3}))?(?(2)\s*\))')
+
+_CURRENCY_SYMBOLS = {'$': 'USD', '€': 'EUR', '£': 'GBP'}
+
+# Currency codes that `parse_amount` recognizes without a regex.  Other
+# three-letter codes are still accepted by the general `_AMOUNT_RE` path.
+_KNOWN_CURRENCIES = frozenset([
+    'AUD', 'CAD', 'CHF', 'CNY', 'DKK', 'EUR', 'GBP', 'HKD', 'INR', 'JPY',
+    'MXN', 'NOK', 'NZD', 'SEK', 'SGD', 'USD'
+])
+
+# Separators removed by `D` before conversion.
+_SEPARATORS_TABLE = str.maketrans('', '', ', ')
+
+@functools.lru_cache(maxsize=2048)
+def _cached_D(x):
+    """Interned version of `D` for number strings that repeat across rows.
+
+    Unlike `D`, separators are only removed if present, and without a regex.
+    """
+    if not x:
+        return D(x)
+    if ',' in x or ' ' in x:
+        x = x.translate(_SEPARATORS_TABLE)
+    try:
+        return decimal.Decimal(x)
+    except decimal.InvalidOperation as exc:
+        raise ValueError('Invalid number: %r' % x) from exc
+
+# Shared instances of frequently parsed amounts.  These are keyed by the number
+# string as written, since e.g. `0` and `0.00` are equal but print differently.
+_COMMON_AMOUNTS = {
+    (number_str, currency): Amount(D(number_str), currency)
+    for number_str in ('0', '0.00', '-0.00', '1.00')
+    for currency in ('USD', 'EUR', 'GBP', 'CAD', 'JPY')
+}
+
+def _make_amount(number_str, currency):
+    amount = _COMMON_AMOUNTS.get((number_str, currency))
+    if amount is None:
+        amount = Amount(_cached_D(number_str), currency)
+    return amount
+
 def parse_negative_parentheses(x):
     """Parses a string in parentheses as a negative."""
-    m = re.fullmatch(r'^\((.*)\)$', x)
+    m = _PAREN_RE.fullmatch(x)
     if m is not None:
         return -1, m.group(1).strip()
     return 1, x
 
 def parse_possible_negative(x):
     x = x.strip()
-    m = re.fullmatch(r'^(-|\+)(.*)$', x)
+    m = _SIGN_RE.fullmatch(x)
     if m is not None:
-        sign = -1 if m.group(1) == '-' else 1
-        return sign, m.group(2).strip()
+        sign = -1 if x[0] == '-' else 1
+        # Trailing whitespace has already been stripped.
+        return sign, m.group(1).lstrip()
     return parse_negative_parentheses(x)
 
+@functools.lru_cache(maxsize=4096)
 def parse_number(x):
     """Parses a number in the format of the CSV file.
 
     A number in parentheses is interpreted as a negative number.
     """
-    sign, number_str = parse_possible_negative(x)
-    return sign * D(number_str)
+    # Same as `parse_possible_negative`, inlined to avoid the regexes and the
+    # intermediate tuple.
+    x = x.strip()
+    first = x[:1]
+    if first == '-':
+        if x[1:2].isdigit():
+            return _cached_D(x)
+        number_str = x[1:].lstrip()
+    elif first == '+':
+        return _cached_D(x[1:].lstrip())
+    elif first == '(' and x[-1:] == ')':
+        number_str = x[1:-1].strip()
+    else:
+        return _cached_D(x)
+    first = number_str[:1]
+    if first.isdigit() or first == '.':
+        return _cached_D('-' + number_str)
+    # `number_str` may carry its own sign, e.g. `(-5)`.
+    return -1 * _cached_D(number_str)
+
+def _is_plain_number(x):
+    """Checks if `x` is an unsigned decimal number without separators."""
+    integer_part, dot, fraction_part = x.partition('.')
+    if integer_part and not (integer_part.isascii() and integer_part.isdigit()):
+        return False
+    if dot:
+        return fraction_part.isascii() and fraction_part.isdigit()
+    return bool(integer_part)
+
+def _parse_simple_amount(x):
+    """Parses the common `$1234.56`, `1234.56 USD` and `USD 1234.56` forms
+    without a regex.
+
+    Any symbol in `_CURRENCY_SYMBOLS` is accepted in place of `$`, and any code
+    in `_KNOWN_CURRENCIES` in place of `USD`.  A leading `-` is also accepted.
 
+    Returns `None` if `x` is not in one of those forms.
+    """
+    sign = ''
+    if x[:1] == '-':
+        sign = '-'
+        x = x[1:]
+    currency = _CURRENCY_SYMBOLS.get(x[:1])
+    if currency is not None:
+        number_str = x[1:]
+    else:
+        number_str, _, currency = x.rpartition(' ')
+        if currency not in _KNOWN_CURRENCIES:
+            currency, _, number_str = x.partition(' ')
+            if currency not in _KNOWN_CURRENCIES:
+                return None
+    if not _is_plain_number(number_str):
+        return None
+    return _make_amount(sign + number_str, currency)
+
+@functools.lru_cache(maxsize=4096)
 def parse_amount(x, assumed_currency=None):
     """Parses a number and currency."""
     if not x:
         return None
-    sign, amount_str = parse_possible_negative(x)
-    m = re.fullmatch(r'(?:[(][^)]+[)])?\s*([\$€£]|[A-Z]{3})?\s*((?:[0-9](?:,?[0-9])*|(?=\.))(?:\.[0-9]+)?)(?:\s+([\$€£]|[A-Z]{3}))?', amount_str)
+    x = x.strip()
+    amount = _parse_simple_amount(x)
+    if amount is not None:
+        return amount
+    m = _AMOUNT_RE.fullmatch(x)
     if m is None:
-        raise ValueError('Failed to parse amount from %r' % amount_str)
-    if m.group(1):
-        # unit before amount
-        if len(m.group(1)) == 3:
-            # 'EUR' or 'USD'
-            currency = m.group(1)
-        else:
-            currency = {'$': 'USD', '€': 'EUR', '£': 'GBP'}[m.group(1)]
-    elif m.group(3):
-        # unit after amount
-        if len(m.group(3)) == 3:
-            # 'EUR' or 'USD'
-            currency = m.group(3)
-        else:
-            currency = {'$': 'USD', '€': 'EUR', '£': 'GBP'}[m.group(3)]
+        raise ValueError('Failed to parse amount from %r' % x)
+    sign, open_paren, prefix, number_str, suffix = m.groups()
+    # A unit before the amount takes precedence over one after it.
+    currency = prefix or suffix
+    if currency:
+        # Map '$', '€' or '£' to a currency code; 'EUR' or 'USD' are used as is.
+        currency = _CURRENCY_SYMBOLS.get(currency, currency)
     elif assumed_currency is not None:
         currency = assumed_currency
     else:
-        raise ValueError('Failed to determine currency from %r' % amount_str)
-    number = D(m.group(2))
-    return Amount(number * sign, currency)
+        raise ValueError('Failed to determine currency from %r' % x)
+    if sign == '-' or open_paren:
+        number_str = '-' + number_str
+    return _make_amount(number_str, currency)
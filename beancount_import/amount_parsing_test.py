@@ -1,6 +1,6 @@
 from beancount.core.number import D
 from beancount.core.amount import Amount
-from .amount_parsing import parse_amount
+from .amount_parsing import parse_amount, parse_number
 
 def test_parsing():
     cases = {
@@ -27,6 +27,10 @@ def test_parsing():
         '.12 CAD': Amount(D('0.12'), 'CAD'),
         '-.12 CAD': Amount(D('-0.12'), 'CAD'),
         '-123.45 CAD': Amount(D('-123.45'), 'CAD'),
+        '12.34 XYZ': Amount(D('12.34'), 'XYZ'),
+        'CAD 12.34': Amount(D('12.34'), 'CAD'),
+        'CAD 12.34 USD': Amount(D('12.34'), 'CAD'),
+        '$ 12.34': Amount(D('12.34'), 'USD'),
 
         '€12345.67': Amount(D('12345.67'), 'EUR'),
         '€12,345.67': Amount(D('12345.67'), 'EUR'),
@@ -51,11 +55,19 @@ def test_parsing():
         '-£.12': Amount(D('-0.12'), 'GBP'),
         '-£123.45': Amount(D('-123.45'), 'GBP'),
 
+        '($12.34)': Amount(D('-12.34'), 'USD'),
+        '( 12.34 CAD )': Amount(D('-12.34'), 'CAD'),
+        '(Pending) $12.34': Amount(D('12.34'), 'USD'),
+
         '$': None,
         '$.': None,
         '€0.': None,
         '£,': None,
         '$123,.00': None,
+        '$1.2.3': None,
+        '1.2.3 USD': None,
+        '($12.34': None,
+        '-($12.34)': None,
         '€,123.00': None,
         '£,47.1': None,
         '$€!@#$': None,
@@ -69,3 +81,36 @@ def test_parsing():
         except ValueError:
             actual = None
         assert expected == actual, input
+
+
+def test_parse_number():
+    cases = {
+        '12.34': D('12.34'),
+        '1,234.56': D('1234.56'),
+        ' 12.34 ': D('12.34'),
+        '-12.34': D('-12.34'),
+        '- 12.34': D('-12.34'),
+        '+12.34': D('12.34'),
+        '(12.34)': D('-12.34'),
+        '( 12.34 )': D('-12.34'),
+        '-(12.34)': None,
+        'abc': None,
+    }
+    for input, expected in cases.items():
+        try:
+            actual = parse_number(input)
+        except ValueError:
+            actual = None
+        assert expected == actual, input
+
+
+def test_parse_amount_whitespace_is_linear():
+    # Previously, runs of whitespace could be split between adjacent `\s*` in
+    # many ways, making a failed match take cubic time.
+    for input in ['-' + ' ' * 20000 + 'x', '(' + ' ' * 20000 + 'x']:
+        try:
+            parse_amount(input)
+        except ValueError:
+            pass
+        else:
+            assert False, 'expected ValueError'
@@ -1,18 +1,50 @@
 #!/usr/bin/env python3
 
 import argparse
+import functools
+import inspect
 import sys
 
 from beancount.query import (query_compile, query_env, query_execute, query_parser)
-from beancount.core import inventory
+from beancount.core import getters
+from beancount.core import prices
 from beancount.core.data import Transaction
 from beancount.parser import options
-from beancount.core import getters
-from beancount.ops import prices
 from . import journal_editor
 import pdb
 
 
+# Newer versions of beancount require a `RowContext` for evaluating the FROM
+# clause.
+_FILTER_ENTRIES_TAKES_CONTEXT = 'context' in inspect.signature(
+    query_execute.filter_entries).parameters
+
+
+class _LazyRowContext(query_execute.RowContext):
+    """`RowContext` that computes the maps derived from the entries on first use.
+
+    Most FROM clauses only examine each entry, so the price map and other maps,
+    each of which requires a full pass over the entries, are often unused.
+    """
+
+    def __init__(self, entries, options_map):
+        self._entries = entries
+        self.options_map = options_map
+        self.account_types = options.get_account_types(options_map)
+
+    @functools.cached_property
+    def open_close_map(self):
+        return getters.get_account_open_close(self._entries)
+
+    @functools.cached_property
+    def commodity_map(self):
+        return getters.get_commodity_map(self._entries)
+
+    @functools.cached_property
+    def price_map(self):
+        return prices.build_price_map(self._entries)
+
+
 def get_matching_entries(entries, options_map, query):
     query_text = 'SELECT * ' + query
     parser = query_parser.Parser()
@@ -24,23 +56,15 @@ def get_matching_entries(entries, options_map, query):
     if parsed_query.where_clause:
         c_where = query_compile.compile_expression(parsed_query.where_clause, query_env.FilterPostingsEnvironment())
 
-    # Figure out if we need to compute balance.
-    balance = None
-    if c_where and query_execute.uses_balance_column(c_where):
-        balance = inventory.Inventory()
-
-    context = query_execute.RowContext()
-    context.balance = balance
-    
-
-    # Initialize some global properties for use by some of the accessors.
-    context.options_map = options_map
-    context.account_types = options.get_account_types(options_map)
-    context.open_close_map = getters.get_account_open_close(entries)
-    #context.commodity_map = getters.get_commodity_map(entries)
-    context.price_map = prices.build_price_map(entries) 
+    # The WHERE clause is compiled to validate it, but is not currently
+    # evaluated (see below).  A `query_execute.RowContext`, with the balance,
+    # price map and open/close map required by the WHERE clause, only needs to
+    # be constructed once it is.
 
-    if c_from is not None:
+    if c_from is not None and _FILTER_ENTRIES_TAKES_CONTEXT:
+        filtered_entries = query_execute.filter_entries(
+            c_from, entries, options_map, _LazyRowContext(entries, options_map))
+    elif c_from is not None:
         filtered_entries = query_execute.filter_entries(c_from, entries, options_map)
     else:
         filtered_entries = entries
@@ -67,15 +91,19 @@ def main():
     editor = journal_editor.JournalEditor(args.journal)
     stage = editor.stage_changes()
 
-    for entry in get_matching_entries(editor.entries, editor.options_map, args.query):
-        stage.remove_entry(entry)
+    stage.remove_entries(
+        get_matching_entries(editor.entries, editor.options_map, args.query))
 
     change_sets, old_entries, new_entries = stage.get_diff()
+    # The diff may be large, so it is written all at once rather than with a
+    # separate `print` call per line.
+    output = []
     for filename, file_change_sets in change_sets:
-        print(filename)
+        output.append(filename + '\n')
         for line_range, line_changes in file_change_sets:
-            for change_type, line in line_changes:
-                print('%s%s' % (CHANGE_TYPE_INDICATOR[change_type], line))
+            output.extend('%s%s\n' % (CHANGE_TYPE_INDICATOR[change_type], line)
+                          for change_type, line in line_changes)
+    sys.stdout.writelines(output)
 
     sys.stdout.write('Continue with change? [yes] (control-c to cancel)')
     result = input().lower()
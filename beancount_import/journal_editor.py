@@ -22,10 +22,14 @@ included in the change set.
 from typing import Union, Dict, Tuple, List, Optional, Set, NamedTuple, Sequence, FrozenSet, Iterable
 import datetime
 import collections
+import collections.abc
 import contextlib
+import functools
 import io
+import operator
 import os
 import re
+import sys
 import threading
 import time
 
@@ -38,6 +42,7 @@ import beancount.parser.booking
 from beancount.core.number import MISSING
 
 from .sorted_entry_printer import SortedEntryPrinter
+from .thread_helpers import call_in_new_thread
 
 # Inclusive starting original line, exclusive ending original line.
 LineRange = Tuple[int, int]
@@ -65,12 +70,21 @@ JournalDiff = NamedTuple('JournalDiff', [
     ('new_entries', Entries),
 ])
 
-ApplyFileChangesResult = NamedTuple('ApplyFileChangesResult', [
-    ('new_contents', str),
-    ('new_lines', List[str]),
-    ('lineno_map', Dict[int, Optional[int]]),
-    ('append_only', bool),
-])
+class ApplyFileChangesResult(NamedTuple('ApplyFileChangesResult', [
+        ('new_lines', Sequence[str]),
+        # Maps each 1-based old line number to the new line number, or `None`
+        # if the line was deleted.  Element 0 is unused.  This is `None` if
+        # `append_only`, since no entry changes its line number then.
+        ('lineno_map', Optional[List[Optional[int]]]),
+        ('append_only', bool),
+])):
+    __slots__ = ()
+
+    @property
+    def new_contents(self) -> str:
+        if isinstance(self.new_lines, _JournalLines):
+            return str(self.new_lines.data, 'utf-8')
+        return '\n'.join(self.new_lines)
 
 ApplyStagedChangesResult = NamedTuple('ApplyStagedChangesResult', [
     ('old_entries', Entries),
@@ -112,7 +126,7 @@ def _intercepted_parse_file(file_modification_times: Dict[str, float]):
         orig_parse_file = beancount.parser.parser.parse_file
 
         def intercept_parse_file(filename, **kw):
-            real_filename = os.path.realpath(filename)
+            real_filename = _realpath(filename)
             try:
                 file_modification_times[real_filename] = os.stat(
                     filename).st_mtime
@@ -144,7 +158,7 @@ def load_file(filename: str, encoding: Optional[str] = None):
     # isn't called from multiple threads concurrently.
     file_modification_times = dict()  # type: Dict[str, float]
     with _load_file_lock, _intercepted_parse_file(file_modification_times):
-        filename = os.path.realpath(filename)
+        filename = _realpath(filename)
 
         orig_book_func = beancount.parser.booking.book
         pre_booking_entries = None
@@ -183,6 +197,33 @@ def _partially_book_entry(orig_entry: Directive,
     """
     if not isinstance(orig_entry, Transaction): return orig_entry
     assert isinstance(booked_entry, Transaction)
+    orig_postings = orig_entry.postings
+    booked_postings = booked_entry.postings
+    if len(orig_postings) == len(booked_postings):
+        # Commonly, booking only fills in missing units, and each booked
+        # posting shares the metadata of the original posting in the same
+        # position.  The parser gives each posting its own metadata dict.
+        positional_postings = []  # type: List[Posting]
+        changed = False
+        for posting, booked_posting in zip(orig_postings, booked_postings):
+            meta = posting.meta
+            if meta is not booked_posting.meta or meta is None:
+                break
+            if posting.units is MISSING and booked_posting.units is not MISSING:
+                # Equivalent to `_replace`, which is much slower, as is
+                # `_replace` for the transaction below.
+                posting = Posting(posting.account, booked_posting.units,
+                                  posting.cost, posting.price, posting.flag,
+                                  meta)
+                changed = True
+            positional_postings.append(posting)
+        else:
+            if not changed:
+                return orig_entry
+            return Transaction(orig_entry.meta, orig_entry.date,
+                               orig_entry.flag, orig_entry.payee,
+                               orig_entry.narration, orig_entry.tags,
+                               orig_entry.links, positional_postings)
     booked_postings_by_meta = dict()  # type: Dict[int, List[Posting]]
     for posting in booked_entry.postings:
         meta = posting.meta
@@ -211,8 +252,12 @@ def get_partially_booked_entries(pre_booking_entries: Entries,
     a list obtained from the pre-booking entries but with missing units included
     from the post-booking entries where possible.
     """
+    # Only transactions are partially booked.  Booking copies the metadata of
+    # each transaction, so entries are matched by location rather than by the
+    # identity of their metadata.
     post_booking_entries_by_meta = dict()  # type: Dict[Tuple[str,int], Entries]
     for entry in post_booking_entries:
+        if not isinstance(entry, Transaction): continue
         meta = entry.meta
         if meta is None: continue
         lineno = meta.get('lineno')
@@ -223,6 +268,9 @@ def get_partially_booked_entries(pre_booking_entries: Entries,
     partially_booked_entries = []  # type: Entries
     empty_list = []  # type: Entries
     for entry in pre_booking_entries:
+        if not isinstance(entry, Transaction):
+            partially_booked_entries.append(entry)
+            continue
         meta = entry.meta
         post_booking_matches = post_booking_entries_by_meta.get(
             (meta.get('filename'), meta.get('lineno')), empty_list)
@@ -234,6 +282,34 @@ def get_partially_booked_entries(pre_booking_entries: Entries,
     return partially_booked_entries
 
 
+def _merge_sorted_entries(entries: Entries, new_entries: Entries) -> Entries:
+    """Returns `entries`, which must be sorted, with `new_entries` inserted.
+
+    This is equivalent to sorting the concatenation of `entries` and
+    `new_entries` by `entry_sortkey`, but only computes the sort keys of the
+    entries compared in a binary search for each new entry.
+    """
+    if not new_entries:
+        return entries
+    sortkey = beancount.core.data.entry_sortkey
+    merged = []  # type: Entries
+    lo = 0
+    for entry in sorted(new_entries, key=sortkey):
+        key = sortkey(entry)
+        start = lo
+        hi = len(entries)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key < sortkey(entries[mid]):
+                hi = mid
+            else:
+                lo = mid + 1
+        merged.extend(entries[start:lo])
+        merged.append(entry)
+    merged.extend(entries[lo:])
+    return merged
+
+
 class _AtomicWriter(atomicwrites.AtomicWriter):
     """Wrapper that calls `os.stat` after close but before the rename."""
 
@@ -247,9 +323,163 @@ class _AtomicWriter(atomicwrites.AtomicWriter):
         self.stat_result_after_close = os.stat(f.name)
 
 
-def _get_journal_contents(filename: str):
-    with open(filename, 'r', encoding='utf-8') as f:
-        return f.read()
+@functools.lru_cache(maxsize=256)
+def _realpath(path: str) -> str:
+    """Memoized version of `os.path.realpath`.
+
+    The same few journal filenames are resolved for nearly every entry that is
+    changed or checked, and resolving symlinks requires a system call for each
+    path component.
+    """
+    return os.path.realpath(path)
+
+
+def _translate_newlines(contents: str) -> str:
+    """Translates newlines as when reading a file in text mode."""
+    if '\r' in contents:
+        contents = contents.replace('\r\n', '\n').replace('\r', '\n')
+    return contents
+
+
+def _is_continuation_line(line: str) -> bool:
+    r"""Checks if `line` continues the preceding entry.
+
+    According to the Beancount grammar, each line of an entry after the first
+    must start with whitespace and contain a non-whitespace character.  This is
+    equivalent to matching `^\s+[^\s]`, but avoids the regex.
+    """
+    return line[:1].isspace() and not line.isspace()
+
+
+def _get_line_ends(data: bytes):
+    """Returns the offsets of the line breaks in `data`, followed by its length."""
+    import numpy as np
+    return np.append(
+        np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 0x0A), len(data))
+
+
+class _JournalLines(collections.abc.Sequence):
+    """Lines of UTF-8 encoded journal contents, decoded on demand.
+
+    This is equivalent to `contents.decode('utf-8').split('\n')`, but only
+    stores the encoded contents and the offset of each line break, rather than
+    a separate string for every line.  Most lines of a journal file are never
+    accessed.
+    """
+
+    def __init__(self, data: bytes, ends=None) -> None:
+        import numpy as np
+        self._data = data
+        if ends is None:
+            ends = _get_line_ends(data)
+        # Offset of the end of each line, i.e. of the line break that follows
+        # it, or of the end of the data for the last line.
+        self._ends = ends.astype(
+            np.int32 if len(data) < 2**31 else np.int64, copy=False)
+
+    @classmethod
+    def join(cls, parts: Sequence[Union[bytes, Tuple['_JournalLines', int, int]]]
+             ) -> '_JournalLines':
+        """Returns the concatenation of the lines of `parts`.
+
+        Each part is either an encoded line, or a tuple `(lines, start, stop)`
+        that specifies the non-empty range `[start, stop)` of the lines of an
+        existing `_JournalLines`.  The line break offsets within such a range
+        are adjusted from those of `lines`, rather than found again.
+        """
+        import numpy as np
+        chunks = []  # type: List[bytes]
+        ends = []
+        offset = 0
+        for part in parts:
+            if isinstance(part, bytes):
+                chunk = part
+                ends.append(_get_line_ends(chunk) + offset)
+            else:
+                lines, start, stop = part
+                chunk = lines.get_data(start, stop)
+                ends.append(lines._ends[start:stop].astype(np.int64) +
+                            (offset - lines._start(start)))
+            chunks.append(chunk)
+            offset += len(chunk) + 1
+        return cls(b'\n'.join(chunks), np.concatenate(ends))
+
+    @property
+    def data(self) -> bytes:
+        """The encoded contents."""
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def _start(self, i: int) -> int:
+        return 0 if i == 0 else int(self._ends[i - 1]) + 1
+
+    def get_data(self, start: int, stop: int) -> bytes:
+        """Returns the encoded lines `[start, stop)`, separated by line breaks.
+
+        Requires `0 <= start < stop <= len(self)`.
+        """
+        return self._data[self._start(start):int(self._ends[stop - 1])]
+
+    def get_continuation_end(self, start: int) -> int:
+        """Returns the index of the first line after line `start` that is not a
+        continuation line, as determined by `_is_continuation_line`.
+
+        The common cases are decided from the encoded lines, without decoding
+        them.
+        """
+        data = self._data
+        size = len(data)
+        line_i = start + 1
+        pos = self._start(line_i)
+        while pos <= size:
+            end = data.find(b'\n', pos)
+            if end == -1:
+                end = size
+            line = data[pos:end]
+            rest = line.lstrip(b' \t')
+            if rest and len(rest) < len(line) and 0x21 <= rest[0] <= 0x7e:
+                pass
+            elif not rest or 0x21 <= line[0] <= 0x7e:
+                break
+            elif not _is_continuation_line(str(line, 'utf-8')):
+                break
+            line_i += 1
+            pos = end + 1
+        return line_i
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            # Decode all of the lines at once.
+            return str(self.get_data(start, stop), 'utf-8').split('\n')
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('line index out of range')
+        return str(self._data[self._start(index):int(self._ends[index])],
+                   'utf-8')
+
+
+def _read_journal_lines(filename: str) -> Sequence[str]:
+    """Returns the lines of `filename`.
+
+    This is equivalent to reading `filename` in text mode as UTF-8 and
+    splitting the contents on `'\n'`.
+    """
+    # Unbuffered, the entire file is read with a single read call sized from
+    # `fstat`, without copying it through a buffer.
+    with open(filename, 'rb', buffering=0) as f:
+        data = f.read()
+    if b'\r' in data:
+        # Lines are only decoded on demand if no newlines need translating.
+        return _translate_newlines(str(data, 'utf-8')).split('\n')
+    return _JournalLines(data)
 
 
 class JournalEditor(object):
@@ -257,7 +487,9 @@ class JournalEditor(object):
                  ignored_path: Optional[str] = None) -> None:
 
         self.default_journal_load_time = time.time()
-        journal_path = os.path.realpath(journal_path)
+        # Symlinks may have changed since a previous journal was loaded.
+        _realpath.cache_clear()
+        journal_path = _realpath(journal_path)
         self.journal_path = journal_path
 
         (final_entries, self.errors, self.options_map, pre_booking_entries,
@@ -266,13 +498,13 @@ class JournalEditor(object):
         del final_entries
         self.entries = get_partially_booked_entries(pre_booking_entries,
                                                     post_booking_entries)
-        self.cached_lines = {}  # type: Dict[str, List[str]]
+        self.cached_lines = {}  # type: Dict[str, Sequence[str]]
         self.accounts, self.commodities = get_accounts_and_commodities(
             self.entries)
         journal_paths = [journal_path] + self.options_map['include']
         ignored_journal_paths = []  # type: List[str]
         if ignored_path is not None:
-            ignored_path = os.path.realpath(ignored_path)
+            ignored_path = _realpath(ignored_path)
             self.ignored_path = ignored_path  # type: Optional[str]
             with _intercepted_parse_file(self.journal_load_time):
                 (pre_booking_ignored_entries, ignored_errors,
@@ -288,9 +520,9 @@ class JournalEditor(object):
             self.ignored_entries = []
             self.ignored_path = None
             self.ignored_options_map = {}
-        self.journal_filenames = set(os.path.realpath(x) for x in journal_paths)
+        self.journal_filenames = set(_realpath(x) for x in journal_paths)
         self.ignored_journal_filenames = set(
-            os.path.realpath(x) for x in ignored_journal_paths)
+            _realpath(x) for x in ignored_journal_paths)
         self._all_entries = None  # type: Optional[Entries]
 
     @property
@@ -301,22 +533,47 @@ class JournalEditor(object):
         return self._all_entries
 
     def get_journal_lines(self, filename: str):
-        filename = os.path.realpath(filename)
+        filename = _realpath(filename)
         if filename in self.cached_lines:
             return (filename, self.cached_lines[filename])
-        lines = _get_journal_contents(filename).split('\n')
+        # Note: `splitlines` must not be used, as it also splits on characters
+        # such as form feeds that beancount does not treat as line breaks.
+        lines = _read_journal_lines(filename)
         self.cached_lines[filename] = lines
         return filename, lines
 
+    def prefetch_journal_lines(self) -> None:
+        """Reads and caches the lines of the journal files containing
+        transactions.
+
+        This allows them to be read ahead of time, e.g. while loading, rather
+        than when the first change is staged.
+        """
+        filenames = set()  # type: Set[str]
+        last_filename = None
+        for entry in self.entries:
+            if isinstance(entry, Transaction):
+                filename = entry.meta['filename']
+                # Skip hashing the filename again in the common case of
+                # consecutive transactions from the same file.
+                if filename is not last_filename:
+                    filenames.add(filename)
+                    last_filename = filename
+        for filename in filenames:
+            filename = _realpath(filename)
+            if filename in self.journal_filenames:
+                self.get_journal_lines(filename)
+
     def get_entry_line_range(self, entry: Directive):
         filename, lines = self.get_journal_lines(entry.meta['filename'])
         start_line = entry.meta['lineno'] - 1
-        line_i = start_line + 1
         # Find last line of transaction
-        # According to Beanacount grammer, each line of the entry must start with whitespace and contain a non-whitespace character.
-        while line_i < len(lines):
-            if not re.match(r'^\s+[^\s]', lines[line_i]):
-                break
+        if isinstance(lines, _JournalLines):
+            return filename, lines, (start_line,
+                                     lines.get_continuation_end(start_line))
+        line_i = start_line + 1
+        num_lines = len(lines)
+        while line_i < num_lines and _is_continuation_line(lines[line_i]):
             line_i += 1
         return filename, lines, (start_line, line_i)
 
@@ -337,9 +594,19 @@ class JournalEditor(object):
                                                  self.default_journal_load_time)
         return (mtime > check_mtime)
 
-    def check_any_journal_modification(self):
+    def check_any_journal_modification(
+            self, filenames: Optional[Iterable[str]] = None) -> Set[str]:
+        """Returns the journal files that have been modified since loading.
+
+        If `filenames` is specified, only those files that are journal files
+        are checked.
+        """
+        if filenames is None:
+            filenames = self.journal_filenames
+        else:
+            filenames = self.journal_filenames.intersection(filenames)
         modified_filenames = set()
-        for f in self.journal_filenames:
+        for f in filenames:
             if self.check_journal_modification(f):
                 modified_filenames.add(f)
         return modified_filenames
@@ -352,53 +619,79 @@ class JournalEditor(object):
         This does not actually modify the specified file.
         """
         _, old_lines = self.get_journal_lines(filename)
+        # If the old lines are decoded on demand, the new contents are instead
+        # assembled from the encoded runs of unchanged lines, without decoding
+        # them.
+        old_lines_are_encoded = isinstance(old_lines, _JournalLines)
         new_lines = []  # type: List[str]
+        new_parts = []  # type: List[Union[bytes, Tuple[_JournalLines, int, int]]]
         next_old_lineno = 0
         next_new_lineno = 0
-        lineno_map = dict()  # type: Dict[int, Optional[int]]
+
+        # Change sets are sorted and do not overlap, so only the first one can
+        # start before the last line.
+        append_only = True
+        if change_sets:
+            start_line = change_sets[0][0][0]
+            if start_line < len(old_lines):
+                if start_line != len(old_lines) - 1 or old_lines[-1].strip():
+                    # If changes start either before the last line or on the
+                    # non-empty last line, then they are not append-only.
+                    append_only = False
+
+        # Indexed by old line number, rather than a dict, since every old line
+        # is mapped.  If lines are only appended, no entry changes its line
+        # number, so none are mapped.
+        lineno_map = None  # type: Optional[List[Optional[int]]]
+        if not append_only:
+            lineno_map = [None] * (len(old_lines) + 1)
 
         def fill_unchanged_lines(end_old_lineno):
             nonlocal next_new_lineno, next_old_lineno
             assert end_old_lineno <= len(
                 old_lines) and end_old_lineno >= next_old_lineno
-            new_lines.extend(old_lines[next_old_lineno:end_old_lineno])
-            for i in range(next_old_lineno, end_old_lineno):
+            num_lines = end_old_lineno - next_old_lineno
+            if num_lines == 0:
+                pass
+            elif old_lines_are_encoded:
+                new_parts.append((old_lines, next_old_lineno, end_old_lineno))
+            else:
+                new_lines.extend(old_lines[next_old_lineno:end_old_lineno])
+            if lineno_map is not None:
                 # +1 because beancount parser uses 1-based line numbers
-                lineno_map[i + 1] = next_new_lineno + 1
-                next_new_lineno += 1
+                lineno_map[next_old_lineno + 1:end_old_lineno + 1] = range(
+                    next_new_lineno + 1, next_new_lineno + 1 + num_lines)
+            next_new_lineno += num_lines
             next_old_lineno = end_old_lineno
 
-        append_only = True
+        add_new_part = new_parts.append
+        add_new_line = new_lines.append
 
         for line_range, line_changes in change_sets:
             fill_unchanged_lines(line_range[0])
 
-            if append_only:
-                if line_range[0] < len(old_lines):
-                    if line_range[0] != len(old_lines) - 1 or old_lines[
-                            -1].strip():
-                        # If changes start either before the last line or on the non-empty last
-                        # line, then they are not append-only.
-                        append_only = False
-
             for change_type, line in line_changes:
-                if change_type >= 0:
-                    new_lines.append(line)
                 if change_type < 0:
-                    lineno_map[next_old_lineno + 1] = None
+                    # Deleted lines are already mapped to `None`.
+                    next_old_lineno += 1
+                    continue
+                if old_lines_are_encoded:
+                    add_new_part(line.encode('utf-8'))
+                else:
+                    add_new_line(line)
+                next_new_lineno += 1
                 if change_type == 0:
-                    lineno_map[next_old_lineno + 1] = next_new_lineno + 1
-                if change_type <= 0:
                     next_old_lineno += 1
-                if change_type >= 0:
-                    next_new_lineno += 1
+                    if lineno_map is not None:
+                        lineno_map[next_old_lineno] = next_new_lineno
             assert next_old_lineno == line_range[1]
 
         fill_unchanged_lines(len(old_lines))
-        new_data = '\n'.join(new_lines)
+        result_lines = new_lines  # type: Sequence[str]
+        if new_parts:
+            result_lines = _JournalLines.join(new_parts)
         return ApplyFileChangesResult(
-            new_contents=new_data,
-            new_lines=new_lines,
+            new_lines=result_lines,
             lineno_map=lineno_map,
             append_only=append_only,
         )
@@ -406,17 +699,44 @@ class JournalEditor(object):
     def apply_file_changes_result(self, filename: str,
                                   result: ApplyFileChangesResult):
         new_lines = result.new_lines
-        new_data = result.new_contents
-        lineno_map = result.lineno_map
-        filename = os.path.realpath(filename)
+        filename = _realpath(filename)
         if self.check_journal_modification(filename):
             raise RuntimeError(
                 'Journal file modified concurrently: %r' % filename)
 
-        writer = _AtomicWriter(
-            filename, mode='w+', encoding='utf-8', newline='\n', overwrite=True)
-        with writer.open() as f:
-            f.write(new_data)
+        old_lines = self.cached_lines.get(filename)
+        if (result.append_only and isinstance(new_lines, _JournalLines) and
+                isinstance(old_lines, _JournalLines) and
+                new_lines.data.startswith(old_lines.data)):
+            # Lines have only been added at the end of the file, so just the
+            # added data is appended, rather than rewriting the entire file.
+            old_len = len(old_lines.data)
+            with open(filename, 'ab') as f:
+                try:
+                    f.write(memoryview(new_lines.data)[old_len:])
+                    f.flush()
+                    os.fsync(f.fileno())
+                except BaseException:
+                    # Remove any partially appended data, so that, as with
+                    # `_AtomicWriter`, the file is either fully updated or
+                    # left unchanged.
+                    f.truncate(old_len)
+                    raise
+            writer = None
+        elif isinstance(new_lines, _JournalLines):
+            writer = _AtomicWriter(filename, mode='wb', overwrite=True)
+            with writer.open() as f:
+                f.write(new_lines.data)
+        else:
+            writer = _AtomicWriter(
+                filename, mode='w+', encoding='utf-8', newline='\n', overwrite=True)
+            with writer.open() as f:
+                # Write the lines individually, rather than
+                # `result.new_contents`, to avoid creating a copy of the entire
+                # file contents in memory.
+                if new_lines:
+                    f.writelines(line + '\n' for line in new_lines[:-1])
+                    f.write(new_lines[-1])
         # On MS Windows, closing a file that has just been written causes the
         # modification time to change.  Therefore, we must close the file before
         # checking the modification time in order to get a modification time
@@ -426,40 +746,55 @@ class JournalEditor(object):
         # may obtain a modification time that reflects additional modifications.
         # The _AtomicWriter wrapper takes care of checking the modification time
         # after closing the file but before renaming it.
-        mtime = writer.stat_result_after_close.st_mtime
+        if writer is None:
+            mtime = os.stat(filename).st_mtime
+        else:
+            mtime = writer.stat_result_after_close.st_mtime
         self.journal_load_time[filename] = mtime
         self.cached_lines[filename] = new_lines
 
-        realpaths = dict()  # type: Dict[str, str]
+        if result.append_only:
+            # No existing entry changes its line number.
+            return
+        assert result.lineno_map is not None
+        lineno_map = result.lineno_map
 
-        def get_realpath(path):
-            result = realpaths.get(path, None)
-            if result is None:
-                result = os.path.realpath(path)
-                realpaths[path] = result
-            return result
+        # Consecutive entries (and their postings) usually have the same
+        # filename, so the result of the last comparison is reused.
+        last_entry_filename = None
+        last_entry_filename_matches = False
 
-        def fix_meta(meta):
+        def fix_meta(meta) -> bool:
+            """Updates the line number in `meta`, and returns `True` if it
+            changed."""
+            nonlocal last_entry_filename, last_entry_filename_matches
             if meta is None:
-                return
+                return False
             entry_filename = meta.get('filename', None)
             if entry_filename is None:
-                return
-            if get_realpath(entry_filename) != filename:
-                return
+                return False
+            if entry_filename is not last_entry_filename:
+                last_entry_filename = entry_filename
+                last_entry_filename_matches = (
+                    _realpath(entry_filename) == filename)
+            if not last_entry_filename_matches:
+                return False
             lineno = meta.get('lineno', None)
             # Automatic Document entries get a lineno of 0
             if lineno is None or lineno == 0:
-                return
-            meta['lineno'] = lineno_map[lineno]
-
-        # Update lines of all entries
-        if not result.append_only:
-            for entry in self.entries:
-                fix_meta(entry.meta)
-                if isinstance(entry, Transaction):
-                    for posting in entry.postings:
-                        fix_meta(posting.meta)
+                return False
+            new_lineno = lineno_map[lineno]
+            meta['lineno'] = new_lineno
+            return new_lineno != lineno
+
+        # Update lines of all entries.  If the first line of an entry keeps its
+        # line number, then so do its postings: lines can only have been
+        # inserted or deleted within the entry if the entry itself was changed,
+        # in which case it is replaced.
+        for entry in self.entries:
+            if fix_meta(entry.meta) and isinstance(entry, Transaction):
+                for posting in entry.postings:
+                    fix_meta(posting.meta)
 
     def get_file_change_results(self, change_sets: List[FileChangeSet]
                                 ) -> Dict[str, ApplyFileChangesResult]:
@@ -481,45 +816,59 @@ class JournalEditor(object):
     def apply_staged_changes(
             self, staged_changes: 'StagedChanges') -> ApplyStagedChangesResult:
         change_sets, old_entries, new_entries = staged_changes.get_diff()
-        self.apply_change_sets(change_sets)
-        old_entries_set = set(map(id, old_entries))
-        self.entries = [
-            e for e in self.entries
-            if id(e) not in old_entries_set and e.meta.get('lineno') is not None
-        ]
-        self.ignored_entries = [
-            e for e in self.ignored_entries
-            if id(e) not in old_entries_set and e.meta.get('lineno') is not None
-        ]
-        booked_new_entries, balance_errors = beancount.parser.booking.book(
-            new_entries, self.options_map)
+        # Booking the new entries does not depend on the updated journal files,
+        # so it proceeds while they are written.
+        booking_future = call_in_new_thread(beancount.parser.booking.book,
+                                            new_entries, self.options_map)
+        results = self.get_file_change_results(change_sets)
+        self.apply_file_change_results(results)
+        # If lines were only appended, the existing entries keep their line
+        # numbers, and therefore remain sorted.
+        lines_moved = not all(result.append_only for result in results.values())
+        if old_entries or lines_moved:
+            old_entries_set = set(map(id, old_entries))
+            self.entries = [
+                e for e in self.entries
+                if id(e) not in old_entries_set and e.meta.get('lineno') is not None
+            ]
+            self.ignored_entries = [
+                e for e in self.ignored_entries
+                if id(e) not in old_entries_set and e.meta.get('lineno') is not None
+            ]
+        booked_new_entries, balance_errors = booking_future.result()
         non_ignored_booked_new_entries = []  # type: Entries
         ignored_booked_new_entries = []  # type: Entries
         for entry in booked_new_entries:
-            if os.path.realpath(entry.meta.get(
+            if _realpath(entry.meta.get(
                     'filename')) in self.ignored_journal_filenames:
-                self.ignored_entries.append(entry)
                 ignored_booked_new_entries.append(entry)
             else:
-                self.entries.append(entry)
                 non_ignored_booked_new_entries.append(entry)
                 if isinstance(entry, Open):
                     self.accounts[entry.account] = entry
                 if isinstance(entry, Commodity):
                     self.commodities[entry.currency] = entry
 
-        self.entries.sort(key=beancount.core.data.entry_sortkey)
-        self.ignored_entries.sort(key=beancount.core.data.entry_sortkey)
+        if lines_moved:
+            self.entries.extend(non_ignored_booked_new_entries)
+            self.entries.sort(key=beancount.core.data.entry_sortkey)
+            self.ignored_entries.extend(ignored_booked_new_entries)
+            self.ignored_entries.sort(key=beancount.core.data.entry_sortkey)
+        else:
+            self.entries = _merge_sorted_entries(
+                self.entries, non_ignored_booked_new_entries)
+            self.ignored_entries = _merge_sorted_entries(
+                self.ignored_entries, ignored_booked_new_entries)
         self._all_entries = None
         return ApplyStagedChangesResult(
             old_entries=[
                 e for e in old_entries
-                if os.path.realpath(e.meta.get('filename')) not in self.
+                if _realpath(e.meta.get('filename')) not in self.
                 ignored_journal_filenames
             ],
             new_entries=non_ignored_booked_new_entries,
             old_ignored_entries=[
-                e for e in old_entries if os.path.realpath(
+                e for e in old_entries if _realpath(
                     e.meta.get('filename')) in self.ignored_journal_filenames
             ],
             new_ignored_entries=ignored_booked_new_entries,
@@ -590,7 +939,7 @@ class LineChangeBuilder(object):
             self.add_lines('')
 
     def match_metadata(self, meta: Meta):
-        assert os.path.realpath(meta['filename']) == self.filename
+        assert _realpath(meta['filename']) == self.filename
         assert meta['lineno'] == self.orig_lineno + 1
 
     def raise_error(self, message: str):
@@ -603,8 +952,8 @@ class LineChangeBuilder(object):
 
 
 class FileChangeSetsBuilder(object):
-    def __init__(self, filename: str, lines: List[str]) -> None:
-        self.filename = os.path.realpath(filename)
+    def __init__(self, filename: str, lines: Sequence[str]) -> None:
+        self.filename = _realpath(filename)
         self.lines = lines
         self.line_delta = 0
         self.builders = []  # type: List[LineChangeBuilder]
@@ -637,15 +986,40 @@ def get_meta_ignore() -> FrozenSet[str]:
 
 META_IGNORE = get_meta_ignore()
 
-metadata_line_re = '^ +([a-z][a-zA-Z0-9\\-_]*) *: *([^a-zA-Z].*)$'
+# Used by the helpers below if no printer is specified.  Constructing an
+# `EntryPrinter` builds its number formatters, and printing does not modify it.
+_default_printer = beancount.parser.printer.EntryPrinter()
 
 
-def compute_metadata_changes(builder, old_meta, new_meta, indent):
-    printer = beancount.parser.printer.EntryPrinter()
+def _get_num_metadata_lines(meta: Meta) -> int:
+    """Returns the number of keys of `meta` not in `META_IGNORE`.
+
+    This is equivalent to `len(meta.keys() - META_IGNORE)`, but checks the few
+    ignored keys instead of building a set.
+    """
+    num_lines = len(meta)
+    for key in META_IGNORE:
+        if key in meta:
+            num_lines -= 1
+    return num_lines
+
+metadata_line_re = re.compile(' +([a-z][a-zA-Z0-9\\-_]*) *: *([^a-zA-Z].*)')
+
+
+def compute_metadata_changes(builder, old_meta, new_meta, indent,
+                             printer: Optional[beancount.parser.printer.EntryPrinter] = None):
+    if printer is None:
+        printer = _default_printer
+    write_metadata = printer.write_metadata
+    prefix = ' ' * indent
+
+    # Reused for each formatted line.
+    oss = io.StringIO()
 
     def format_metadata_line(key):
-        oss = io.StringIO()
-        printer.write_metadata({key: new_meta[key]}, oss, prefix=' ' * indent)
+        oss.seek(0)
+        oss.truncate()
+        write_metadata({key: new_meta[key]}, oss, prefix=prefix)
         return oss.getvalue().rstrip()
 
     old_meta_not_seen = set(old_meta.keys())
@@ -654,7 +1028,7 @@ def compute_metadata_changes(builder, old_meta, new_meta, indent):
         line = builder.cur_orig_line
         if line is None:
             break
-        m = re.fullmatch(metadata_line_re, line)
+        m = metadata_line_re.fullmatch(line)
         if m is None:
             break
         key = m.group(1)
@@ -675,68 +1049,129 @@ def compute_metadata_changes(builder, old_meta, new_meta, indent):
         builder.add_lines(format_metadata_line(key))
 
 
-def get_posting_line(posting: Posting) -> str:
-    printer = beancount.parser.printer.EntryPrinter()
+def _has_same_fields(old, new, ignored_fields: Tuple[str, ...]) -> bool:
+    """Checks if the fields of the named tuples `old` and `new`, other than
+    `ignored_fields`, are the same objects.
+
+    If so, they print the same, which is much cheaper to check than printing
+    them.  Merely equal fields are not sufficient, since e.g. `Decimal('1.0')`
+    and `Decimal('1.00')` are equal but print differently.
+    """
+    if type(old) is not type(new):
+        return False
+    for field, old_value, new_value in zip(old._fields, old, new):
+        if old_value is not new_value and field not in ignored_fields:
+            return False
+    return True
+
+
+def _get_first_line(entry: Directive,
+                    printer: beancount.parser.printer.EntryPrinter) -> str:
+    if isinstance(entry, Transaction):
+        # The postings are not needed for the first line.
+        entry = entry._replace(postings=[])
+    return printer(entry).split('\n', 1)[0]
+
+
+def get_posting_line(posting: Posting,
+                     printer: Optional[beancount.parser.printer.EntryPrinter] = None) -> str:
+    if printer is None:
+        printer = _default_printer
     flag_account, position_str, _ = printer.render_posting_strings(posting)
     return ('  %s  %s' % (flag_account, position_str)).rstrip()
 
 
 def compute_posting_changes(builder: LineChangeBuilder, old_posting: Posting,
-                            new_posting: Posting):
+                            new_posting: Posting,
+                            printer: Optional[beancount.parser.printer.EntryPrinter] = None):
+    if printer is None:
+        printer = _default_printer
     builder.match_metadata(old_posting.meta)
-    old_posting_line = get_posting_line(old_posting)
-    new_posting_line = get_posting_line(new_posting)
-    if old_posting_line == new_posting_line:
+    if _has_same_fields(old_posting, new_posting, ('meta', )):
+        # Commonly, only the metadata of the posting changed.
         builder.keep_line()
     else:
-        builder.replace_line(new_posting_line)
+        old_posting_line = get_posting_line(old_posting, printer)
+        new_posting_line = get_posting_line(new_posting, printer)
+        if old_posting_line == new_posting_line:
+            builder.keep_line()
+        else:
+            builder.replace_line(new_posting_line)
     compute_metadata_changes(
         builder=builder,
         old_meta=old_posting.meta,
         new_meta=new_posting.meta,
-        indent=4)
+        indent=4,
+        printer=printer)
 
 
 class StagedChanges(object):
     def __init__(self, journal_editor: JournalEditor) -> None:
         self.journal_editor = journal_editor
+        # Maps each filename to a list of `(sort_key, old_entry, new_entry)`
+        # tuples, where `sort_key` is the line number of `old_entry`, or
+        # `sys.maxsize` if an entry is added.
         self.changed_entries = collections.OrderedDict(
-        )  # type: Dict[str, List[Tuple[Optional[Directive], Optional[Directive]]]]
+        )  # type: Dict[str, List[Tuple[int, Optional[Directive], Optional[Directive]]]]
         self._cached_diff = None  # type: Optional[JournalDiff]
 
     def add_entry(self, new_entry: Directive, output_filename: str):
-        self.changed_entries.setdefault(os.path.realpath(output_filename),
-                                        []).append((None, new_entry))
+        self.changed_entries.setdefault(_realpath(output_filename),
+                                        []).append((sys.maxsize, None, new_entry))
         self._cached_diff = None
 
     def remove_entry(self, old_entry: Directive):
         if 'filename' not in old_entry.meta or 'lineno' not in old_entry.meta:
             raise ValueError('Cannot remove entry without filename and line')
         self.changed_entries.setdefault(
-            os.path.realpath(old_entry.meta['filename']), []).append((old_entry,
-                                                                      None))
+            _realpath(old_entry.meta['filename']), []).append(
+                (old_entry.meta['lineno'], old_entry, None))
+        self._cached_diff = None
+
+    def remove_entries(self, old_entries: Iterable[Directive]):
+        """Equivalent to calling `remove_entry` for each of `old_entries`.
+
+        Consecutive entries from the same file, which share the same filename
+        object, are added to the same list of changes without another lookup.
+        """
+        # Cleared first, since entries before one that cannot be removed are
+        # still staged, as with `remove_entry`.
         self._cached_diff = None
+        # Matches no filename, not even a `None` filename, which must be
+        # rejected by `_realpath` as in `remove_entry`.
+        last_filename = object()  # type: object
+        file_changes = []  # type: List[Tuple[int, Optional[Directive], Optional[Directive]]]
+        for old_entry in old_entries:
+            meta = old_entry.meta
+            if 'filename' not in meta or 'lineno' not in meta:
+                raise ValueError('Cannot remove entry without filename and line')
+            filename = meta['filename']
+            if filename is not last_filename:
+                file_changes = self.changed_entries.setdefault(
+                    _realpath(filename), [])
+                last_filename = filename
+            file_changes.append((meta['lineno'], old_entry, None))
 
     def change_entry(self, old_entry: Directive, new_entry: Directive):
         if not isinstance(old_entry, Transaction) or not isinstance(
                 new_entry, Transaction):
             raise NotImplementedError('only Transaction entries supported')
         self.changed_entries.setdefault(
-            os.path.realpath(old_entry.meta['filename']), []).append(
-                (old_entry, new_entry))
+            _realpath(old_entry.meta['filename']), []).append(
+                (old_entry.meta['lineno'], old_entry, new_entry))
         self._cached_diff = None
 
     def make_with_new_output_filename(self,
                                       output_filename: str) -> 'StagedChanges':
         new_stage = StagedChanges(self.journal_editor)
         for change_pairs in self.changed_entries.values():
-            for old_entry, new_entry in change_pairs:
+            for _, old_entry, new_entry in change_pairs:
                 if old_entry is None:
                     new_stage.add_entry(new_entry, output_filename)
                 elif new_entry is None:
                     new_stage.remove_entry(old_entry)
-                elif os.path.realpath(
-                        old_entry.meta['filename']) == os.path.realpath(
+                elif _realpath(
+                        old_entry.meta['filename']) == _realpath(
                             output_filename):
                     new_stage.change_entry(old_entry, new_entry)
                 else:
@@ -748,7 +1183,7 @@ class StagedChanges(object):
         """Returns a sequence of the new entries WITHOUT updated line numbers."""
         return [
             new_entry for _, changed_entries in self.changed_entries.items()
-            for _, new_entry in changed_entries
+            for _, _, new_entry in changed_entries
         ]
 
     def get_all_accounts(
@@ -761,49 +1196,61 @@ class StagedChanges(object):
                 return account
             return account_map.get(account, account)
 
-        accounts = collections.OrderedDict(
-        )  # type: Dict[str, Tuple[datetime.date, Set[str]]]
+        accounts = {}  # type: Dict[str, Tuple[datetime.date, Set[str]]]
         open_accounts = set()
 
-        def add_account(account: str, date: datetime.date, currencies: Optional[Iterable[str]]):
-            if currencies is None:
-                currencies = set()
-            existing_date, existing_currencies = accounts.setdefault(
-                account, (date, set(currencies)))
-            existing_currencies.update(currencies)
+        def add_account(account: str, date: datetime.date,
+                        currencies: Optional[Iterable[str]]) -> Set[str]:
+            """Adds `account`, and returns its set of currencies."""
+            existing = accounts.get(account)
+            if existing is None:
+                existing_currencies = set(
+                    currencies) if currencies else set()  # type: Set[str]
+                accounts[account] = (date, existing_currencies)
+                return existing_currencies
+            existing_date, existing_currencies = existing
+            if currencies:
+                existing_currencies.update(currencies)
             if existing_date > date:
-                existing_date = date
-            accounts[account] = (existing_date, existing_currencies)
+                accounts[account] = (date, existing_currencies)
+            return existing_currencies
 
         for entry in self.get_all_new_entries():
-            if isinstance(entry, Open):
+            if isinstance(entry, Transaction):
+                date = entry.date
+                other_currencies = set()  # type: Set[str]
+                # Currency sets of the accounts of postings without units, which
+                # are assigned the other currency of the transaction, if unique.
+                missing_units_currencies = []  # type: List[Set[str]]
+                for posting in entry.postings:
+                    units = posting.units
+                    price = posting.price
+                    if units is None or units is MISSING:
+                        units = None
+                        missing_units_currencies.append(
+                            add_account(
+                                map_account(posting.account), date, None))
+                    else:
+                        add_account(
+                            map_account(posting.account), date,
+                            (units.currency, ))
+                    if price is not None and price is not MISSING:
+                        other_currencies.add(price.currency)
+                    elif posting.cost is not None and posting.cost.currency is not None:
+                        other_currencies.add(posting.cost.currency)
+                    elif units is not None:
+                        other_currencies.add(units.currency)
+                if len(other_currencies) == 1:
+                    for currencies in missing_units_currencies:
+                        currencies.update(other_currencies)
+            elif isinstance(entry, Open):
                 account = map_account(entry.account)
                 open_accounts.add(account)
                 add_account(account, entry.date, entry.currencies)
             elif isinstance(entry, Balance):
                 add_account(
                     map_account(entry.account), entry.date,
-                    [entry.amount.currency])
-            elif isinstance(entry, Transaction):
-                other_currencies = set()  # type: Set[str]
-                for posting in entry.postings:
-                    if posting.price is not None and posting.price is not MISSING:
-                        other_currencies.add(posting.price.currency)
-                    elif posting.cost is not None and posting.cost.currency is not None:
-                        other_currencies.add(posting.cost.currency)
-                    elif posting.units is not None and posting.units is not MISSING:
-                        other_currencies.add(posting.units.currency)
-
-                for posting in entry.postings:
-                    if posting.units is None or posting.units is MISSING:
-                        if len(other_currencies) == 1:
-                            currencies = other_currencies  # type: Iterable[str]
-                        else:
-                            currencies = []
-                    else:
-                        currencies = [posting.units.currency]
-                    add_account(
-                        map_account(posting.account), entry.date, currencies)
+                    (entry.amount.currency, ))
         return accounts, open_accounts
 
     def get_missing_accounts(self,
@@ -822,15 +1269,16 @@ class StagedChanges(object):
         new_entries = []
         old_entries = []
 
+        # Shared by all of the helpers below, rather than each constructing
+        # its own printer.
         printer = SortedEntryPrinter()
 
         for filename, changed_entries in self.changed_entries.items():
-            changed_entries.sort(key=lambda x: float('inf')
-                                 if x[0] is None else x[0].meta['lineno'])
+            changed_entries.sort(key=operator.itemgetter(0))
             _, lines = self.journal_editor.get_journal_lines(filename)
             change_sets_builder = FileChangeSetsBuilder(
                 filename=filename, lines=lines)
-            for old_entry, new_entry in changed_entries:
+            for _, old_entry, new_entry in changed_entries:
                 if new_entry is None:
                     # Remove entry
                     _, _, line_range = self.journal_editor.get_entry_line_range(
@@ -855,12 +1303,13 @@ class StagedChanges(object):
                     new_entry = builder.set_metadata(new_entry)
                     if isinstance(new_entry, Transaction):
                         new_postings = []  # type: List[Posting]
-                        cur_lineno = new_entry.meta['lineno'] + 1 + len(
-                            new_entry.meta.keys() - META_IGNORE)
+                        cur_lineno = new_entry.meta[
+                            'lineno'] + 1 + _get_num_metadata_lines(
+                                new_entry.meta)
                         for posting in new_entry.postings:
                             posting = builder.set_metadata(posting, cur_lineno)
-                            cur_lineno += 1 + len(posting.meta.keys() -
-                                                  META_IGNORE)
+                            cur_lineno += 1 + _get_num_metadata_lines(
+                                posting.meta)
                             new_postings.append(posting)
                         new_entry = new_entry._replace(postings=new_postings)
                     new_entries.append(new_entry)
@@ -874,19 +1323,26 @@ class StagedChanges(object):
                     _, _, line_range = self.journal_editor.get_entry_line_range(
                         old_entry)
                     builder = change_sets_builder.add_builder(line_range)
-                    old_print_result = printer(old_entry).split('\n')
-                    new_print_result = printer(new_entry).split('\n')
+                    if _has_same_fields(old_entry, new_entry,
+                                        ('meta', 'postings')):
+                        new_first_line = None
+                    else:
+                        new_first_line = _get_first_line(new_entry, printer)
+                        if _get_first_line(old_entry,
+                                           printer) == new_first_line:
+                            new_first_line = None
                     new_entry = builder.set_metadata(new_entry)
-                    if old_print_result[0] == new_print_result[0]:
+                    if new_first_line is None:
                         # First line is the same
                         builder.keep_line()
                     else:
-                        builder.replace_line(new_print_result[0].rstrip())
+                        builder.replace_line(new_first_line.rstrip())
                     compute_metadata_changes(
                         builder=builder,
                         old_meta=old_entry.meta,
                         new_meta=new_entry.meta,
-                        indent=2)
+                        indent=2,
+                        printer=printer)
                     assert isinstance(old_entry, Transaction) == isinstance(
                         new_entry, Transaction)
                     if isinstance(old_entry, Transaction):
@@ -903,12 +1359,13 @@ class StagedChanges(object):
                                 compute_posting_changes(
                                     builder=builder,
                                     old_posting=old_posting,
-                                    new_posting=new_posting)
+                                    new_posting=new_posting,
+                                    printer=printer)
                                 next_old_posting_i += 1
                             else:
                                 new_posting_lines = []
                                 new_posting_lines.append(
-                                    get_posting_line(new_posting))
+                                    get_posting_line(new_posting, printer))
                                 oss = io.StringIO()
                                 printer.write_metadata(
                                     new_posting.meta, oss, prefix='    ')
@@ -1,4 +1,6 @@
 import datetime
+import errno
+import os
 
 import beancount.parser.printer
 from beancount.core.data import Transaction, Posting, EMPTY_SET
@@ -57,6 +59,28 @@ def create_journal(tmpdir: py.path.local,
     return str(path)
 
 
+def test_read_journal_lines(tmpdir):
+    assert list(journal_editor._read_journal_lines(
+        create_journal(tmpdir, 'a\r\nb\rc\n\xe9\x0c'))) == ['a', 'b', 'c', '\xe9\x0c']
+    lines = journal_editor._read_journal_lines(
+        create_journal(tmpdir, 'a\n\xe9\x0c\n\nb', name='lazy.beancount'))
+    assert list(lines) == ['a', '\xe9\x0c', '', 'b']
+    assert lines[-1] == 'b'
+    assert lines[1:3] == ['\xe9\x0c', '']
+    assert list(journal_editor._read_journal_lines(
+        create_journal(tmpdir, '', name='empty.beancount'))) == ['']
+
+
+def test_get_continuation_end():
+    lines = journal_editor._JournalLines(
+        b'2015-01-01 *\n  A  1 USD\n\t\xc3\xa9\n \t\n  B\n \xc2\xa0\n'
+        b'2015-01-02 *\n  C')
+    assert lines.get_continuation_end(0) == 3
+    assert lines.get_continuation_end(3) == 5
+    assert lines.get_continuation_end(4) == 5
+    assert lines.get_continuation_end(6) == 8
+
+
 def test_load_file_simple(tmpdir):
     """Tests that partial booking resolves the missing units."""
     journal_path = create_journal(
@@ -336,6 +360,47 @@ def test_remove(tmpdir):
     check_journal_entries(editor)
 
 
+def test_remove_entries(tmpdir):
+    journal_path = create_journal(
+        tmpdir, """
+2015-01-01 * "Test transaction 1"
+  Assets:Account-A  100 USD
+  Assets:Account-B
+
+2015-02-01 * "Test transaction"
+  Assets:Account-A  100 USD
+  Assets:Account-B
+
+2015-03-01 * "Test transaction 2"
+  Assets:Account-A  100 USD
+  Assets:Account-B
+""")
+    editor = journal_editor.JournalEditor(journal_path)
+    stage = editor.stage_changes()
+    old_entries = [editor.entries[0], editor.entries[2]]
+    assert stage.get_diff().old_entries == []
+    with pytest.raises(ValueError):
+        stage.remove_entries(
+            [old_entries[0], editor.entries[1]._replace(meta={})])
+    # The entries before the invalid one are staged, as with `remove_entry`.
+    assert stage.get_diff().old_entries == [old_entries[0]]
+    with pytest.raises(TypeError):
+        stage.remove_entries(
+            [editor.entries[1]._replace(meta={'filename': None, 'lineno': 1})])
+    stage = editor.stage_changes()
+    stage.remove_entries(old_entries)
+    result = stage.apply()
+    assert result.old_entries == old_entries
+    assert result.new_entries == []
+    check_file_contents(
+        journal_path, """
+2015-02-01 * "Test transaction"
+  Assets:Account-A  100 USD
+  Assets:Account-B
+""")
+    check_journal_entries(editor)
+
+
 def test_add(tmpdir):
     journal_path = create_journal(
         tmpdir, """
@@ -392,6 +457,147 @@ def test_add(tmpdir):
 """)
     check_journal_entries(editor)
 
+def test_merge_sorted_entries():
+    import beancount.core.data
+
+    def make_entry(day, lineno):
+        return Transaction(
+            meta={'lineno': lineno},
+            date=datetime.date(2015, 1, day),
+            flag='*',
+            payee=None,
+            narration=None,
+            tags=EMPTY_SET,
+            links=EMPTY_SET,
+            postings=[])
+
+    entries = [make_entry(day, lineno) for day in (1, 3, 5) for lineno in (1, 2, 2)]
+    new_entries = [
+        make_entry(6, 1), make_entry(3, 2), make_entry(1, 0), make_entry(3, 2)
+    ]
+    merged = journal_editor._merge_sorted_entries(entries, new_entries)
+    expected = sorted(
+        entries + new_entries, key=beancount.core.data.entry_sortkey)
+    assert list(map(id, merged)) == list(map(id, expected))
+    assert journal_editor._merge_sorted_entries(entries, []) is entries
+
+def test_add_appends_in_place(tmpdir):
+    journal_path = create_journal(
+        tmpdir, """
+2015-01-01 * "Test transaction 1"
+  Assets:Account-A  100 USD
+  Assets:Account-B
+""")
+    editor = journal_editor.JournalEditor(journal_path)
+    old_inode = os.stat(journal_path).st_ino
+    stage = editor.stage_changes()
+    stage.add_entry(
+        Transaction(
+            meta=None,
+            date=datetime.date(2015, 4, 1),
+            flag='*',
+            payee=None,
+            narration='New transaction',
+            tags=EMPTY_SET,
+            links=EMPTY_SET,
+            postings=[
+                Posting(
+                    account='Assets:Account-A',
+                    units=Amount(Decimal(3), 'USD'),
+                    cost=None,
+                    price=None,
+                    flag=None,
+                    meta=None),
+                Posting(
+                    account='Assets:Account-B',
+                    units=MISSING,
+                    cost=None,
+                    price=None,
+                    flag=None,
+                    meta=None),
+            ],
+        ), journal_path)
+    stage.apply()
+    check_file_contents(
+        journal_path, """
+2015-01-01 * "Test transaction 1"
+  Assets:Account-A  100 USD
+  Assets:Account-B
+
+2015-04-01 * "New transaction"
+  Assets:Account-A  3 USD
+  Assets:Account-B
+""")
+    # The file was appended to, rather than replaced.
+    assert os.stat(journal_path).st_ino == old_inode
+    assert not editor.check_journal_modification(journal_path)
+    check_journal_entries(editor)
+
+def test_add_appends_in_place_failure(tmpdir, monkeypatch):
+    contents = """
+2015-01-01 * "Test transaction 1"
+  Assets:Account-A  100 USD
+  Assets:Account-B
+"""
+    journal_path = create_journal(tmpdir, contents)
+    editor = journal_editor.JournalEditor(journal_path)
+
+    class FailingWriteFile(object):
+        """Writes only part of the data before failing."""
+
+        def __init__(self, f):
+            self.f = f
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return self.f.__exit__(*args)
+
+        def write(self, data):
+            self.f.write(data[:len(data) // 2])
+            self.f.flush()
+            raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+        def __getattr__(self, name):
+            return getattr(self.f, name)
+
+    monkeypatch.setattr(
+        journal_editor, 'open',
+        lambda *args, **kwargs: FailingWriteFile(open(*args, **kwargs)),
+        raising=False)
+    stage = editor.stage_changes()
+    stage.add_entry(
+        Transaction(
+            meta=None,
+            date=datetime.date(2015, 4, 1),
+            flag='*',
+            payee=None,
+            narration='New transaction',
+            tags=EMPTY_SET,
+            links=EMPTY_SET,
+            postings=[
+                Posting(
+                    account='Assets:Account-A',
+                    units=Amount(Decimal(3), 'USD'),
+                    cost=None,
+                    price=None,
+                    flag=None,
+                    meta=None),
+                Posting(
+                    account='Assets:Account-B',
+                    units=MISSING,
+                    cost=None,
+                    price=None,
+                    flag=None,
+                    meta=None),
+            ],
+        ), journal_path)
+    with pytest.raises(OSError):
+        stage.apply()
+    # The partially appended data was removed.
+    check_file_contents(journal_path, contents)
+
 def test_add_ignored(tmpdir):
     journal_path = create_journal(
         tmpdir, """
@@ -245,36 +245,39 @@ class PostingDatabase(object):
                  is_cleared: IsClearedFunction,
                  metadata_keys=frozenset()) -> None:
         self.fuzzy_match_days = fuzzy_match_days
+        self._fuzzy_date_offsets = tuple(
+            datetime.timedelta(days=day_offset)
+            for day_offset in range(-fuzzy_match_days, fuzzy_match_days + 1))
         self.fuzzy_match_amount = fuzzy_match_amount
         self.is_cleared = is_cleared
+        # Postings indexed by their own (unfuzzed) date and currency.
         self._date_currency = collections.defaultdict(list) # type: Dict[DateCurrencyKey, List[SearchPosting]]
-        self._date_currency_dirty = collections.defaultdict(bool) # type: Dict[DateCurrencyKey, bool]
+        # Sorted postings within the fuzzy date range of a (date, currency)
+        # key.  These are computed only for the keys that are searched, and
+        # invalidated when a posting within the range is added or removed.
+        self._fuzzy_date_currency = {} # type: Dict[DateCurrencyKey, List[SearchPosting]]
         self._keyed_postings = {
         }  # type: Dict[DatabaseMetadataKey, DatabaseValues]
         self.metadata_keys = metadata_keys
 
     def get_fuzzy_date_range(self, orig_date: datetime.date):
-        for day_offset in range(-self.fuzzy_match_days,
-                                self.fuzzy_match_days + 1):
-            yield orig_date + datetime.timedelta(days=day_offset)
+        for offset in self._fuzzy_date_offsets:
+            yield orig_date + offset
 
     def fuzz_date_currency_key(self, key: DateCurrencyKey) -> Iterable[DateCurrencyKey]:
-        for d in self.get_fuzzy_date_range(key[0]):
-            yield d, key[1]
+        date, currency = key
+        return [(date + offset, currency) for offset in self._fuzzy_date_offsets]
 
-    def _date_currency_key(self, entry: Transaction, mp: MatchablePosting) -> DateCurrencyKey:
+    def _date_currency_key_and_search_posting(
+            self, key: SourcePostingIds, entry: Transaction,
+            mp: MatchablePosting) -> Tuple[DateCurrencyKey, SearchPosting]:
         pw = get_posting_weight(mp.posting)
         currency = ""
-        if pw is not None:
-            currency = pw.currency
-        return (_date_key(entry, mp), currency)
-
-    def _search_posting(self, key: SourcePostingIds, entry: Transaction, mp: MatchablePosting):
-        pw = get_posting_weight(mp.posting)
         number = None
         if pw is not None:
+            currency = pw.currency
             number = pw.number
-        return SearchPosting(
+        return (_date_key(entry, mp), currency), SearchPosting(
             number=number,
             key=key,
             entry=entry,
@@ -292,20 +295,37 @@ class PostingDatabase(object):
                 group = self._keyed_postings.setdefault((account, key, value), {})
                 group[source_posting_ids] = (entry, mp)
 
-        weight = get_posting_weight(mp.posting)
-        if weight is None:
+        dc, sp = self._date_currency_key_and_search_posting(
+            source_posting_ids, entry, mp)
+        if sp.number is None:
             return
 
-        sp = self._search_posting(source_posting_ids, entry, mp)
-        for dc in self.fuzz_date_currency_key(self._date_currency_key(entry, mp)):
-            self._date_currency[dc].append(sp)
-            self._date_currency_dirty[dc] = True
+        self._date_currency[dc].append(sp)
+        self._invalidate_fuzzy_date_currency(dc)
+
+    def _invalidate_fuzzy_date_currency(self, key: DateCurrencyKey):
+        fuzzy_date_currency = self._fuzzy_date_currency
+        if not fuzzy_date_currency:
+            # Common case while the database is initially populated.
+            return
+        for dc in self.fuzz_date_currency_key(key):
+            fuzzy_date_currency.pop(dc, None)
 
     def get_date_currency_postings(self, key: DateCurrencyKey) -> List[SearchPosting]:
-        if self._date_currency_dirty[key]:
-            self._date_currency[key].sort()
-            self._date_currency_dirty[key] = False
-        return self._date_currency[key]
+        """Returns the postings within the fuzzy date range of `key`.
+
+        The returned list is sorted, and must not be modified.
+        """
+        postings = self._fuzzy_date_currency.get(key)
+        if postings is None:
+            postings = []
+            for dc in self.fuzz_date_currency_key(key):
+                dc_postings = self._date_currency.get(dc)
+                if dc_postings is not None:
+                    postings.extend(dc_postings)
+            postings.sort()
+            self._fuzzy_date_currency[key] = postings
+        return postings
 
     def search_postings(self,
                         entry: Transaction,
@@ -321,7 +341,7 @@ class PostingDatabase(object):
                 continue
             if negate:
                 weight = -weight
-            postings_date_currency[self._date_currency_key(entry, mp)].append((weight, id(mp), mp.posting))
+            postings_date_currency[(_date_key(entry, mp), weight.currency)].append((weight, id(mp), mp.posting))
         for dc, items in postings_date_currency.items():
             items.sort()
 
@@ -329,7 +349,6 @@ class PostingDatabase(object):
 
         for key in keys:
             db = self.get_date_currency_postings(key)
-            s = slice(0,1)
             for weight, _, p in postings_date_currency[key]:
                 # Do meta lookup first
                 if not negate and not is_unknown_account(p.account):
@@ -356,21 +375,13 @@ class PostingDatabase(object):
 
                 upper = weight.number + self.fuzzy_match_amount
                 lower = weight.number - self.fuzzy_match_amount
-                # Expand window for fuzzy match
-                while db[s.stop-1].number <= upper:
-                    if s.stop >= len(db):
-                        break
-                    s = slice(s.start, s.stop+1)
-                # Contract window for fuzzy match
-                while db[s.start].number < lower:
-                    if s.start >= len(db):
-                        break
-                    s = slice(s.start+1, s.stop)
-
-                for i in db[s]:
-                    # Because of slice shenanigans, we want to double check
-                    # upper and lower
-                    if lower <= i.number <= upper and cmp_callable(p, i):
+                # `db` is sorted by number, so the postings within the fuzzy
+                # amount range are found by binary search, as in
+                # `_get_matches`.
+                lower_bound = bisect.bisect_left(db, (lower, tuple(), None, None))
+                upper_bound = bisect.bisect_right(db, (upper, (sys.maxsize,), None, None), lo=lower_bound)
+                for i in db[lower_bound:upper_bound]:
+                    if cmp_callable(p, i):
                         yield i
 
     def add_transaction(self, transaction: Transaction):
@@ -391,9 +402,10 @@ class PostingDatabase(object):
                 if group is not None:
                     group.pop(source_posting_ids, None)
 
-        sp = self._search_posting(source_posting_ids, entry, mp)
-        for dc in self.fuzz_date_currency_key(self._date_currency_key(entry, mp)):
-            self._date_currency[dc].remove(sp)
+        dc, sp = self._date_currency_key_and_search_posting(
+            source_posting_ids, entry, mp)
+        self._date_currency[dc].remove(sp)
+        self._invalidate_fuzzy_date_currency(dc)
 
     def remove_transaction(self, transaction: Transaction):
         for mp in get_matchable_postings_from_transaction(
@@ -1,7 +1,7 @@
 import collections
 import datetime
 import re
-from typing import List, Optional, Union, Callable, Dict, Mapping, Tuple, Any, Iterable, Set, NamedTuple
+from typing import List, Optional, Union, Callable, Dict, Mapping, Tuple, Any, Iterable, Set, NamedTuple, Sequence, Pattern, FrozenSet
 import argparse
 import os
 import tempfile
@@ -27,7 +27,12 @@ from .matching import FIXME_ACCOUNT, is_unknown_account, CLEARED_KEY
 
 display_prediction_explanation = False
 
-classifier_cache_version_number = 1
+# Whether to evaluate the accuracy of the classifier on its own training
+# examples after training.  This is only useful for debugging, and is skipped
+# by default since it requires classifying every training example.
+evaluate_classifier_accuracy = False
+
+classifier_cache_version_number = 2
 
 PendingEntry = NamedTuple('PendingEntry', [
     ('date', datetime.date),
@@ -49,16 +54,16 @@ def is_account_unknown(posting: Posting) -> bool:
 
 
 def include_import_transaction(transaction: Transaction,
-                               account_pattern: str) -> bool:
+                               account_pattern: Pattern[str]) -> bool:
     for posting in transaction.postings:
-        if not is_unknown_account(posting.account) and re.fullmatch(
-                account_pattern, posting.account):
+        if not is_unknown_account(posting.account) and account_pattern.fullmatch(
+                posting.account):
             return True
     return False
 
 
 def include_import_result(import_result: ImportResult,
-                          account_pattern: Optional[str]) -> bool:
+                          account_pattern: Optional[Pattern[str]]) -> bool:
     if account_pattern is None:
         return True
     for entry in import_result.entries:
@@ -66,7 +71,7 @@ def include_import_result(import_result: ImportResult,
             if include_import_transaction(entry, account_pattern):
                 return True
         elif isinstance(entry, Balance):
-            if re.fullmatch(account_pattern, entry.account):
+            if account_pattern.fullmatch(entry.account):
                 return True
             # else:
             #     print('excluding balance entry %r' % (entry,))
@@ -129,14 +134,27 @@ def _get_unique_id_for_account(account: str) -> str:
     return ''.join(random.choice(unique_id_characters) for _ in range(length))
 
 
+def get_training_examples_hash(
+        training_examples: List[Tuple[training.FeatureNames, str]]) -> str:
+    """Returns a hash that identifies a list of training examples.
+
+    This allows retraining to be skipped if the training examples have not
+    changed.
+    """
+    h = hashlib.blake2b()
+    for features, label in training_examples:
+        h.update(('\0'.join(features) + '\1' + label + '\2').encode())
+    return h.hexdigest()
+
+
 def get_prediction_explanation(classifier, features: Dict[str, bool]):
     tree = classifier._clf.tree_
 
     lines = []
 
-    converted_features = classifier._vectorizer.transform([features])
-    class_names = classifier._encoder.classes_
-    feature_names = classifier._vectorizer.get_feature_names_out()
+    converted_features = classifier.get_feature_matrix([features])
+    class_names = classifier.labels
+    feature_names = classifier.feature_names
 
     node_id = 0
     while True:
@@ -261,10 +279,17 @@ def with_metadata(x, new_meta):
     return x._replace(meta=meta)
 
 
-def get_filename_from_map(account_map: List[Tuple[str, str]], account_name: str, default_output: str) -> str:
+def compile_account_map(account_map: Optional[List[Tuple[str, str]]]
+                        ) -> Optional[List[Tuple[Pattern[str], str]]]:
+    if account_map is None:
+        return None
+    return [(re.compile(pattern), filename) for pattern, filename in account_map]
+
+
+def get_filename_from_map(account_map: Optional[List[Tuple[Pattern[str], str]]], account_name: str, default_output: str) -> str:
     if account_map is not None:
         for pattern, filename in account_map:
-            if re.match(pattern, account_name):
+            if pattern.match(account_name):
                 return filename
     return default_output
 
@@ -272,9 +297,9 @@ def get_filename_from_map(account_map: List[Tuple[str, str]], account_name: str,
 class EntryFileSelector(object):
     def __init__(self, default_map, open_map, balance_map, price_output,
                  default_output):
-        self.default_map = default_map
-        self.open_map = open_map
-        self.balance_map = balance_map
+        self.default_map = compile_account_map(default_map)
+        self.open_map = compile_account_map(open_map)
+        self.balance_map = compile_account_map(balance_map)
         self.default_output = default_output
         if price_output is None:
             price_output = default_output
@@ -349,9 +374,13 @@ def stage_missing_accounts(stage, entry_file_selector, account_map=None):
         stage.add_entry(open_entry, entry_file_selector(open_entry))
 
 
+# Formats the entries of each pending import result.
+_pending_entry_printer = beancount.parser.printer.EntryPrinter()
+
+
 def make_pending_entry(import_result: ImportResult, source: Optional[Source]):
-    printer = beancount.parser.printer.EntryPrinter()
-    formatted = '\n'.join(printer(e) for e in import_result.entries)
+    formatted = '\n'.join(
+        _pending_entry_printer(e) for e in import_result.entries)
     identifier = hashlib.sha256(formatted.encode()).hexdigest()
     return PendingEntry(
         date=import_result.date,
@@ -366,18 +395,29 @@ def make_pending_entry(import_result: ImportResult, source: Optional[Source]):
 class LoadedReconciler(object):
     """Represents the loaded reconciler state."""
 
-    def __init__(self, reconciler, sources=None, classifier=None) -> None:
+    def __init__(self,
+                 reconciler,
+                 sources=None,
+                 classifier=None,
+                 classifier_training_examples_hash=None,
+                 prediction_cache=None) -> None:
         self.reconciler = reconciler
+
+        # The sources do not depend on the journal, so load them in a separate
+        # thread while the journal is loading.
+        sources_future = None
+        if sources is None:
+            sources_future = call_in_new_thread(self._load_sources)
+
         reconciler.log_status('Loading journal')
         self.editor = journal_editor.JournalEditor(reconciler.journal_path,
                                                    reconciler.ignore_path)
         self.errors = [('error', e[1], e[0]) for e in self.editor.errors]
 
-        if sources is not None:
-            self.sources = sources
+        if sources_future is not None:
+            self.sources = sources_future.result()
         else:
-            # Load sources
-            self._load_sources()
+            self.sources = sources
 
         self.posting_db = matching.PostingDatabase(
             fuzzy_match_days=reconciler.options['fuzzy_match_days'],
@@ -390,6 +430,19 @@ class LoadedReconciler(object):
         # in the posting_db is an existing or pending transaction.
         self.pending_transaction_ids = set()  # type: Set[int]
 
+        # Maps the id of a pending transaction to the transaction and the
+        # result of `matching.get_extended_transactions` for it.  Cleared
+        # whenever `posting_db` changes.
+        self._extended_transactions_cache = {
+        }  # type: Dict[int, Tuple[Transaction, List[matching.MergedTransaction]]]
+
+        # Maps the id of a transaction to the transaction and its unknown
+        # account group features.  These are computed both when predicting
+        # the accounts of all pending transactions and when computing the
+        # candidates for each one.
+        self._unknown_account_features_cache = {
+        }  # type: Dict[int, Tuple[Transaction, List[Optional[training.PredictionInput]]]]
+
         self.balance_entries = dict(
         )  # type: Dict[Tuple[datetime.date, str, str], Decimal]
         self.price_values = set()  # type: Set[Tuple[datetime.date, str, Amount]]
@@ -409,7 +462,14 @@ class LoadedReconciler(object):
         self.training_examples = training.TrainingExamples()
         self._extract_training_examples(self.editor.entries)
 
+        # Predictions made by `classifier` for a previous load of the journal
+        # remain valid, since they depend only on the features.
+        self._prediction_cache = prediction_cache or {}  # type: Dict[FrozenSet[str], str]
+        self._prediction_cache_classifier = classifier if prediction_cache else None  # type: Any
         self.classifier = classifier
+        # Hash of the training examples used to train `self.classifier`, if
+        # known.  See `get_training_examples_hash`.
+        self.classifier_training_examples_hash = classifier_training_examples_hash  # type: Optional[str]
         if self.classifier is None:
             classifier_cache_path = self.reconciler.options['classifier_cache']
             if classifier_cache_path is not None and os.path.exists(
@@ -421,6 +481,8 @@ class LoadedReconciler(object):
                         if version != classifier_cache_version_number:
                             raise RuntimeError('invalid version')
                         self.classifier = cache_data['classifier']
+                        self.classifier_training_examples_hash = cache_data.get(
+                            'training_examples_hash')
                 except:
                     import traceback
                     traceback.print_exc()
@@ -428,13 +490,21 @@ class LoadedReconciler(object):
 
         if self.classifier is None:
             self._maybe_train_classifier()
+        # Predict the accounts of the pending transactions while the journal
+        # files are read, so that neither is left for the first candidate.
+        predict_future = call_in_new_thread(self._predict_pending_accounts)
+
+        # Read the journal files that are likely to be modified now, rather
+        # than when the first candidate is computed.
+        self.editor.prefetch_journal_lines()
+        predict_future.result()
 
     def _extract_training_examples(self, entries: Entries) -> None:
         self._feature_extractor.extract_examples(entries,
                                                  self.training_examples)
 
-    def _load_sources(self):
-        sources = self.sources = [
+    def _load_sources(self) -> List[Source]:
+        return [
             load_source(spec, log_status=self.reconciler.log_status)
             for spec in self.reconciler.options['data_sources']
         ]
@@ -459,6 +529,7 @@ class LoadedReconciler(object):
 
     def retrain(self):
         self._maybe_train_classifier()
+        self._predict_pending_accounts()
         return self
 
     def _maybe_train_classifier(self):
@@ -467,23 +538,34 @@ class LoadedReconciler(object):
             if x[1] != FIXME_ACCOUNT
         ]
         if len(training_examples) > 0:
+            training_examples_hash = get_training_examples_hash(
+                training_examples)
+            if (self.classifier is not None and
+                    self.classifier_training_examples_hash ==
+                    training_examples_hash):
+                # The examples are unchanged since the classifier was trained,
+                # so it is kept rather than retrained.
+                self.reconciler.log_status(
+                    'Classifier is already trained with the current %d examples.'
+                    % len(training_examples))
+                return
             self.reconciler.log_status(
                 'Training classifier with %d examples' % len(training_examples))
-            import nltk
-            import sklearn.tree
-
-            self.classifier = nltk.classify.scikitlearn.SklearnClassifier(
-                estimator=sklearn.tree.DecisionTreeClassifier())
+            self.classifier = training.AccountClassifier()
             self.classifier.train(training_examples)
+            self.classifier_training_examples_hash = training_examples_hash
             self.reconciler.log_status(
                 'Trained classifier with %d examples.' % len(training_examples))
+            if evaluate_classifier_accuracy:
+                self._evaluate_classifier_accuracy(training_examples)
             classifier_cache_path = self.reconciler.options['classifier_cache']
             if classifier_cache_path is None:
                 return
             renamed = False
             cache_data = {
                 'version': classifier_cache_version_number,
-                'classifier': self.classifier
+                'classifier': self.classifier,
+                'training_examples_hash': training_examples_hash,
             }
             with tempfile.NamedTemporaryFile(
                     mode='wb',
@@ -499,15 +581,20 @@ class LoadedReconciler(object):
                     if not renamed:
                         os.remove(cache_f.name)
             # sklearn.tree.export_graphviz(self.classifier._clf,
-            #                              feature_names=self.classifier._vectorizer.get_feature_names(),
-            #                              class_names=self.classifier._encoder.classes_,
+            #                              feature_names=self.classifier.feature_names,
+            #                              class_names=self.classifier.labels,
             #                              out_file='/tmp/tree.dot')
-            # print('Evaluating accuracy of classifier')
-            # errors = 0
-            # for features, label in training_examples:
-            #     if self.classifier.classify(features) != label:
-            #         errors += 1
-            # print('Classifier accuracy: %.4f', 1 - float(errors) / len(training_examples))
+
+    def _evaluate_classifier_accuracy(self, training_examples):
+        print('Evaluating accuracy of classifier')
+        # Classify all examples with a single call, rather than one at a time.
+        predictions = self.classifier.classify_many(
+            [features for features, _ in training_examples])
+        errors = sum(
+            prediction != label
+            for prediction, (_, label) in zip(predictions, training_examples))
+        print('Classifier accuracy: %.4f' %
+              (1 - float(errors) / len(training_examples)))
 
     def _prepare_sources(self) -> List[SourceResults]:
         self.reconciler.log_status('Matching source data')
@@ -654,6 +741,8 @@ class LoadedReconciler(object):
                                import_results: List[ImportResult]
                                ) -> Tuple[List[PendingEntry], List[Directive]]:
         account_pattern = self.reconciler.options['account_pattern']
+        if account_pattern is not None:
+            account_pattern = re.compile(account_pattern)
         output = []
         balance_and_price_entries = []  # type: List[Directive]
         posting_db = self.posting_db
@@ -694,15 +783,85 @@ class LoadedReconciler(object):
 
     def predict_account(
             self, prediction_input: Optional[training.PredictionInput]) -> str:
-        if self.classifier is None or prediction_input is None:
-            return FIXME_ACCOUNT
-        features = training.get_features(prediction_input)
-        explanation = get_prediction_explanation(self.classifier, features)
-        predicted_account = self.classifier.classify(features)
+        return self.predict_accounts([prediction_input])[0]
+
+    def get_prediction_cache(self, classifier) -> Optional[Dict[FrozenSet[str], str]]:
+        """Returns the cached predictions of `classifier`, if any."""
+        if self._prediction_cache_classifier is not classifier:
+            return None
+        return self._prediction_cache
+
+    def predict_accounts(
+            self, prediction_inputs: Sequence[Optional[training.PredictionInput]]
+    ) -> List[str]:
+        """Predicts the account for each of `prediction_inputs`.
+
+        All of the predictions that are not already cached are made with a
+        single call to the classifier, which is much faster than classifying
+        each input separately.
+        """
+        predicted_accounts = [FIXME_ACCOUNT] * len(prediction_inputs)
+        classifier = self.classifier
+        if classifier is None:
+            return predicted_accounts
+
+        # The same pending entries are predicted again each time the
+        # candidates are recomputed, so predictions are cached for as long as
+        # the classifier is unchanged.  Since all feature values are true, the
+        # set of feature names identifies the input.
+        if self._prediction_cache_classifier is not classifier:
+            self._prediction_cache = {}
+            self._prediction_cache_classifier = classifier
+        prediction_cache = self._prediction_cache
+
+        uncached_indices = []  # type: List[int]
+        uncached_keys = []  # type: List[FrozenSet[str]]
+        uncached_features = []  # type: List[Dict[str, bool]]
+        for i, prediction_input in enumerate(prediction_inputs):
+            if prediction_input is None:
+                continue
+            features = training.get_features(prediction_input)
+            key = frozenset(features)
+            predicted_account = prediction_cache.get(key)
+            if predicted_account is None:
+                uncached_indices.append(i)
+                uncached_keys.append(key)
+                uncached_features.append(features)
+            else:
+                predicted_accounts[i] = predicted_account
+            if display_prediction_explanation:
+                explanation = get_prediction_explanation(classifier, features)
+                print('\n'.join(explanation))
+        if uncached_features:
+            for i, key, predicted_account in zip(
+                    uncached_indices, uncached_keys,
+                    classifier.classify_many(uncached_features)):
+                prediction_cache[key] = predicted_account
+                predicted_accounts[i] = predicted_account
         if display_prediction_explanation:
-            print('\n'.join(explanation))
-            print('predicted account = %r' % (predicted_account, ))
-        return predicted_account
+            print('predicted accounts = %r' % (predicted_accounts, ))
+        return predicted_accounts
+
+    def _predict_pending_accounts(self) -> None:
+        """Predicts the unknown accounts of all pending transactions at once.
+
+        The predictions are stored in the prediction cache used by
+        `predict_accounts`, so that computing the candidates for each pending
+        entry does not require a separate call to the classifier.
+        """
+        if self.classifier is None:
+            return
+        prediction_inputs = [
+        ]  # type: List[Optional[training.PredictionInput]]
+        for pending in self.pending_data:
+            if len(pending.entries) != 1:
+                continue
+            entry = pending.entries[0]
+            if not isinstance(entry, Transaction):
+                continue
+            prediction_inputs.extend(
+                self._get_unknown_account_group_features(entry))
+        self.predict_accounts(prediction_inputs)
 
     def _get_generic_stage(self, entries: Entries):
         stage = self.editor.stage_changes()
@@ -726,14 +885,23 @@ class LoadedReconciler(object):
                 return -source_posting.units.number
         return None
 
+    def _get_unknown_account_group_features(
+            self, transaction: Transaction
+    ) -> List[Optional[training.PredictionInput]]:
+        cached = self._unknown_account_features_cache.get(id(transaction))
+        if cached is not None and cached[0] is transaction:
+            return cached[1]
+        group_prediction_inputs = self._feature_extractor.extract_unknown_account_group_features(
+            transaction)
+        self._unknown_account_features_cache[id(transaction)] = (
+            transaction, group_prediction_inputs)
+        return group_prediction_inputs
+
     def _get_unknown_account_predictions(self,
                                          transaction: Transaction) -> List[str]:
-        group_prediction_inputs = self._feature_extractor.extract_unknown_account_group_features(
+        group_prediction_inputs = self._get_unknown_account_group_features(
             transaction)
-        group_predictions = [
-            self.predict_account(prediction_input)
-            for prediction_input in group_prediction_inputs
-        ]
+        group_predictions = self.predict_accounts(group_prediction_inputs)
         group_numbers = training.get_unknown_account_group_numbers(transaction)
         return [
             group_predictions[group_number] for group_number in group_numbers
@@ -822,13 +990,28 @@ class LoadedReconciler(object):
             ),
             substitute=substitute)
 
+    def _get_extended_transactions(self, transaction: Transaction
+                                   ) -> List[Tuple[Transaction, List[Transaction]]]:
+        """Returns the cached result of `matching.get_extended_transactions`.
+
+        This avoids recomputing the matches when the user skips back and forth
+        between pending entries without accepting any candidates.
+        """
+        cached = self._extended_transactions_cache.get(id(transaction))
+        if cached is not None and cached[0] is transaction:
+            return cached[1]
+        match_results = matching.get_extended_transactions(
+            transaction, posting_db=self.posting_db)
+        self._extended_transactions_cache[id(transaction)] = (transaction,
+                                                              match_results)
+        return match_results
+
     def _make_candidates_from_import_result(self, next_pending):
         if len(next_pending.entries) == 1 and isinstance(
                 next_pending.entries[0], Transaction):
             next_entry = next_pending.entries[0]
             candidates = []
-            match_results = matching.get_extended_transactions(
-                next_entry, posting_db=self.posting_db)
+            match_results = list(self._get_extended_transactions(next_entry))
             # Always include the original transaction.
             match_results.append((next_entry, [next_entry]))
             for transaction, used_transactions in match_results:
@@ -901,6 +1084,9 @@ class LoadedReconciler(object):
         old_entries = result.old_entries
         new_entries = result.new_entries
 
+        self._extended_transactions_cache.clear()
+        self._unknown_account_features_cache.clear()
+
         for entry in old_entries:
             if isinstance(entry, Transaction):
                 self.posting_db.remove_transaction(entry)
@@ -958,6 +1144,10 @@ class Reconciler(object):
             LoadedReconciler,
             reconciler=self,
             classifier=classifier,
+            classifier_training_examples_hash=loaded_reconciler.
+            classifier_training_examples_hash,
+            prediction_cache=loaded_reconciler.get_prediction_cache(
+                classifier),
             sources=existing_sources)
 
     def retrain(self):
@@ -84,11 +84,15 @@ def main():
         stage.change_entry(entry, entry._replace(postings=new_postings))
 
     change_sets, old_entries, new_entries = stage.get_diff()
+    # The diff may be large, so it is written all at once rather than with a
+    # separate `print` call per line.
+    output = []
     for filename, file_change_sets in change_sets:
-        print(filename)
+        output.append(filename + '\n')
         for line_range, line_changes in file_change_sets:
-            for change_type, line in line_changes:
-                print('%s%s' % (CHANGE_TYPE_INDICATOR[change_type], line))
+            output.extend('%s%s\n' % (CHANGE_TYPE_INDICATOR[change_type], line)
+                          for change_type, line in line_changes)
+    sys.stdout.writelines(output)
 
     sys.stdout.write('Continue with change? [yes] (control-c to cancel)')
     result = input().lower()
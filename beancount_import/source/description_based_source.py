@@ -1,7 +1,6 @@
 """Facilities for defining sources based on non-unique description text."""
 
 import datetime
-import collections
 from typing import Iterable, Tuple, Dict, TypeVar, Callable, List, AbstractSet, Union
 
 from beancount.core.data import Transaction, Posting, Open, Directive, CostSpec, Meta
@@ -93,15 +92,19 @@ def get_pending_and_invalid_entries(
                     continue
                 matched_postings.setdefault(key, []).append((entry, posting))
 
-    matched_postings_counter = collections.Counter(
-    )  # type: Dict[RawEntryKey, int]
-    for key, entry_posting_pairs in matched_postings.items():
-        matched_postings_counter[key] += len(entry_posting_pairs)
+    # Number of matched postings not yet accounted for by a raw entry.  This is
+    # a plain dict rather than a `Counter`, since every raw entry is looked up,
+    # and a `Counter` handles missing keys in Python code.
+    matched_postings_counter = {
+        key: len(entry_posting_pairs)
+        for key, entry_posting_pairs in matched_postings.items()
+    }  # type: Dict[RawEntryKey, int]
 
     for raw_entry in raw_entries:
         key = get_key_from_raw_entry(raw_entry)
-        if matched_postings_counter[key] > 0:
-            matched_postings_counter[key] -= 1
+        count = matched_postings_counter.get(key)
+        if count:
+            matched_postings_counter[key] = count - 1
         else:
             results.add_pending_entry(make_import_result(raw_entry))
 
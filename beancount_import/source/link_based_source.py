@@ -18,12 +18,13 @@ class LinkBasedSource:
             results: SourceResults,
     ) -> Dict[str, List[Transaction]]:
         link_prefix = self.link_prefix
+        link_prefix_len = len(link_prefix)
         seen_entries = dict()  # type: Dict[str, Entries]
         for entry in all_entries:
             if not isinstance(entry, Transaction): continue
             for link in entry.links:
                 if not link.startswith(link_prefix): continue
-                txn_id = link[len(link_prefix):]
+                txn_id = link[link_prefix_len:]
                 seen_entries.setdefault(txn_id, []).append(entry)
         for txn_id, entries in seen_entries.items():
             expected_count = 1 if txn_id in valid_links else 0
@@ -42,10 +43,11 @@ class LinkBasedSource:
                             entry: Directive) -> Optional[List[AssociatedData]]:
         if not isinstance(entry, Transaction): return None
         link_prefix = self.link_prefix
+        link_prefix_len = len(link_prefix)
         associated_data = []  # type: List[AssociatedData]
         for link in entry.links:
             if link.startswith(link_prefix):
-                txn_id = link[len(link_prefix):]
+                txn_id = link[link_prefix_len:]
                 cur_results = self.get_associated_data_for_link(txn_id)
                 if cur_results is not None:
                     for x in cur_results:
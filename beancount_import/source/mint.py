@@ -139,7 +139,7 @@ duplicate, there are two ways you can deal with this:
    excludes transactions that have been marked as duplicates.
 """
 
-from typing import List, Union, Optional, Set
+from typing import List, Union, Optional, Sequence, Set
 import csv
 import datetime
 import collections
@@ -175,6 +175,25 @@ def get_info(raw_entry: Union[MintEntry, RawBalance]) -> dict:
 mint_date_format = '%m/%d/%Y'
 
 
+def parse_mint_date(date_str: str) -> datetime.date:
+    """Parses a date in `mint_date_format`.
+
+    The common `MM/DD/YYYY` form is parsed directly, since `strptime` is
+    comparatively slow.  Anything else is left to `strptime`.
+    """
+    parts = date_str.split('/')
+    if len(parts) == 3:
+        month, day, year = parts
+        if (0 < len(month) <= 2 and 0 < len(day) <= 2 and len(year) == 4 and
+                (month + day + year).isascii() and
+                (month + day + year).isdigit()):
+            try:
+                return datetime.date(int(year), int(month), int(day))
+            except ValueError:
+                pass
+    return datetime.datetime.strptime(date_str, mint_date_format).date()
+
+
 def load_transactions(filename: str, currency: str) -> List[MintEntry]:
     expected_field_names = [
         'Date', 'Description', 'Original Description', 'Amount',
@@ -184,16 +203,35 @@ def load_transactions(filename: str, currency: str) -> List[MintEntry]:
     try:
         entries = []
         filename = os.path.abspath(filename)
+        # Rows are read as lists rather than with `csv.DictReader`, which
+        # builds a dict for each row.
+        date_i = expected_field_names.index('Date')
+        source_desc_i = expected_field_names.index('Original Description')
+        amount_i = expected_field_names.index('Amount')
+        transaction_type_i = expected_field_names.index('Transaction Type')
+        account_i = expected_field_names.index('Account Name')
+        num_fields = len(expected_field_names)
         with open(filename, 'r', encoding='utf-8', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            if reader.fieldnames != expected_field_names:
+            reader = csv.reader(csvfile)
+            field_names = next(reader, None)
+            if field_names != expected_field_names:
                 raise RuntimeError(
                     'Actual field names %r != expected field names %r' %
-                    (reader.fieldnames, expected_field_names))
-            for line_i, row in enumerate(reader):
-                account = row['Account Name']
-                transaction_type = row['Transaction Type']
-                number = D(row['Amount'])
+                    (field_names, expected_field_names))
+            line_i = -1
+            for csv_row in reader:
+                if not csv_row:
+                    # Skip blank lines, as `csv.DictReader` does.
+                    continue
+                line_i += 1
+                row = csv_row  # type: Sequence[Optional[str]]
+                if len(csv_row) < num_fields:
+                    # Missing fields are treated as `None`, as in
+                    # `csv.DictReader`.
+                    row = csv_row + [None] * (num_fields - len(csv_row))
+                account = row[account_i]
+                transaction_type = row[transaction_type_i]
+                number = D(row[amount_i])
                 if number == ZERO:
                     # Skip zero-dollar transactions.
                     # Some banks produce these, e.g. for an annual fee that is waived.
@@ -201,19 +239,22 @@ def load_transactions(filename: str, currency: str) -> List[MintEntry]:
                 if transaction_type == 'debit':
                     number = -number
                 elif transaction_type != 'credit':
-                    raise RuntimeError('Unknown transaction type: %r in row %r'
-                                       % (transaction_type, row))
+                    raise RuntimeError(
+                        'Unknown transaction type: %r in row %r' %
+                        (transaction_type, dict(zip(expected_field_names, row))))
+                date_str = row[date_i]
                 try:
-                    date = datetime.datetime.strptime(row['Date'],
-                                                      mint_date_format).date()
+                    if date_str is None:
+                        raise ValueError('missing date')
+                    date = parse_mint_date(date_str)
                 except Exception as e:
-                    raise RuntimeError('Invalid date: %r' % row['Date']) from e
+                    raise RuntimeError('Invalid date: %r' % date_str) from e
 
                 entries.append(
                     MintEntry(
                         account=account,
                         date=date,
-                        source_desc=row['Original Description'],
+                        source_desc=row[source_desc_i],
                         amount=Amount(number=number, currency=currency),
                         filename=filename,
                         line=line_i + 1))
@@ -242,7 +283,7 @@ def load_balances(filename: str) -> List[RawBalance]:
             date_str = row['Last Transaction'].strip()
             if not date_str:
                 continue
-            date = datetime.datetime.strptime(date_str, mint_date_format).date()
+            date = parse_mint_date(date_str)
             balances.append(
                 RawBalance(
                     account=row['Name'],
@@ -51,6 +51,7 @@ breakdown as well, it works better to leave `tax_accounts` unspecified.
 """
 
 from typing import Union, Optional, List, Set, Dict, Tuple, Any
+import concurrent.futures
 import datetime
 import os
 import re
@@ -76,16 +77,27 @@ TRADE_REFERENCE_NUMBER_KEY = 'trade_ref_number'
 def load_documents(directory: str, log_status: LogFunction):
     releases = []
     trades = []
+    documents = []
     for name in sorted(os.listdir(directory)):
         path = os.path.join(directory, name)
         class_type = get_document_type(path)
         if class_type is None: continue
-        log_status('stockplanconnect_source: loading %s' % name)
-        doc = class_type(path)
-        if class_type is Release:
-            releases.append(doc)
-        else:
-            trades.append(doc)
+        documents.append((name, path, class_type))
+    # Each document is converted to text by a separate `pdftotext` process, so
+    # the documents are parsed concurrently rather than waiting for each
+    # process in turn.
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        futures = [
+            executor.submit(class_type, path)
+            for _, path, class_type in documents
+        ]
+        for (name, _, class_type), future in zip(documents, futures):
+            log_status('stockplanconnect_source: loading %s' % name)
+            doc = future.result()
+            if class_type is Release:
+                releases.append(doc)
+            else:
+                trades.append(doc)
     return releases, trades
 
 
@@ -8,6 +8,8 @@ import subprocess
 from beancount.core.number import D, ZERO, Decimal
 from beancount.core.data import Amount
 
+from ..amount_parsing import parse_amount
+
 ParsedValues = List[Tuple[str, Dict[str, Any]]]
 
 ParseResult = NamedTuple('ParseResult', [
@@ -46,10 +48,7 @@ def parse(text: str) -> ParseResult:
     def parse_currency(x: Optional[str]) -> Optional[Decimal]:
         if x is None:
             return None
-        x = x.replace('$', '')
-        if x.startswith('('):
-            return -D(x[1:-1])
-        return D(x)
+        return parse_amount(x).number
 
     def parse_yesno(x: Optional[str]) -> Optional[bool]:
         if x is None:
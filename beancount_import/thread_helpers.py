@@ -1,25 +1,63 @@
+from typing import Callable, Deque, Tuple
+import collections
 import concurrent.futures
 import threading
 
 class DaemonThreadExecutor(concurrent.futures.Executor):
-    """Launches each task in a separate daemon thread."""
+    """Launches each task in a separate daemon thread.
+
+    A thread that has finished its task waits up to `idle_timeout` seconds to
+    be reused for another task before exiting, so that a new thread is started
+    only if no thread is idle.  Tasks never wait for a thread to become
+    available, so a task may itself submit tasks and wait for their results.
+    """
+
+    def __init__(self, idle_timeout: float = 60) -> None:
+        self._idle_timeout = idle_timeout
+        self._condition = threading.Condition()
+        self._tasks = collections.deque(
+        )  # type: Deque[Tuple[concurrent.futures.Future, Callable, tuple, dict]]
+        # Number of idle threads that have not been assigned a task.
+        self._num_idle = 0
 
     def submit(self, fn, *args, **kwargs):
         f = concurrent.futures.Future()
-        def wrapper():
-            if not f.set_running_or_notify_cancel():
-                return
-            try:
-                f.set_result(fn(*args, **kwargs))
-            except Exception as e:
-                f.set_exception(e)
-
-        t = threading.Thread(target = wrapper)
+        task = (f, fn, args, kwargs)
+        with self._condition:
+            if self._num_idle > 0:
+                self._num_idle -= 1
+                self._tasks.append(task)
+                self._condition.notify()
+                return f
+
+        t = threading.Thread(target=self._worker, args=(task, ))
         t.daemon = True
         t.start()
         return f
 
+    def _worker(self, task):
+        while True:
+            f, fn, args, kwargs = task
+            # Release references to the task before waiting for the next one.
+            task = None
+            if f.set_running_or_notify_cancel():
+                try:
+                    f.set_result(fn(*args, **kwargs))
+                except Exception as e:
+                    f.set_exception(e)
+            del f, fn, args, kwargs
+            with self._condition:
+                self._num_idle += 1
+                while not self._tasks:
+                    if not self._condition.wait(self._idle_timeout) and not self._tasks:
+                        self._num_idle -= 1
+                        return
+                task = self._tasks.popleft()
+
+
+_executor = DaemonThreadExecutor()
+
 
 def call_in_new_thread(f, *args, **kwargs):
-    executor = DaemonThreadExecutor()
-    return executor.submit(f, *args, **kwargs)
+    """Calls `f` in a daemon thread, reusing an idle thread if possible."""
+    return _executor.submit(f, *args, **kwargs)
@@ -0,0 +1,39 @@
+import threading
+import time
+
+from . import thread_helpers
+
+
+def test_daemon_thread_executor_reuses_threads():
+    executor = thread_helpers.DaemonThreadExecutor()
+    first_thread = executor.submit(threading.get_ident).result()
+    # Wait for the thread to become idle.
+    while executor._num_idle == 0:
+        time.sleep(0.001)
+    assert executor.submit(threading.get_ident).result() == first_thread
+
+
+def test_daemon_thread_executor_nested():
+    executor = thread_helpers.DaemonThreadExecutor()
+
+    def outer():
+        return executor.submit(lambda: 1).result() + 1
+
+    futures = [executor.submit(outer) for _ in range(4)]
+    assert [f.result(timeout=10) for f in futures] == [2] * 4
+
+
+def test_daemon_thread_executor_exception():
+    executor = thread_helpers.DaemonThreadExecutor()
+
+    def fail():
+        raise ValueError('error')
+
+    assert isinstance(executor.submit(fail).exception(timeout=10), ValueError)
+    assert executor.submit(lambda: 3).result(timeout=10) == 3
+
+
+def test_daemon_thread_executor_idle_timeout():
+    executor = thread_helpers.DaemonThreadExecutor(idle_timeout=0.01)
+    assert executor.submit(lambda: 1).result(timeout=10) == 1
+    assert executor.submit(lambda: 2).result(timeout=10) == 2
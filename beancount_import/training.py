@@ -1,8 +1,8 @@
-import collections
 import datetime
 import functools
 import itertools
 import re
+import sys
 from typing import Callable, Any, Dict, Iterable, List, NamedTuple, Sequence, Union, Optional, Tuple, Set
 
 from beancount.core.data import Directive, Entries, Transaction, Posting
@@ -26,10 +26,50 @@ PredictionInput = NamedTuple('PredictionInput',
                               ('date', datetime.date),
                               ('key_value_pairs', ExampleKeyValuePairs)])
 
+# Maximum number of words in a phrase feature generated from a key-value pair,
+# excluding the feature for the entire value.
+MAX_FEATURE_PHRASE_WORDS = 3
+
+
+def _get_value_phrases(value: str) -> List[str]:
+    """Returns the normalized phrases of `value`.
+
+    The phrases are all contiguous word sequences of up to
+    `MAX_FEATURE_PHRASE_WORDS` words, plus the entire normalized value, so that
+    the number of phrases is linear in the number of words.
+    """
+    words = []
+    for w in value.split():
+        w = w.strip('-.').lower()
+        if len(w) > 0:
+            words.append(w)
+    phrases = [' '.join(words[start_i:start_i + n])
+               for n in range(1, min(MAX_FEATURE_PHRASE_WORDS, len(words)) + 1)
+               for start_i in range(len(words) - n + 1)]
+    if len(words) > MAX_FEATURE_PHRASE_WORDS:
+        phrases.append(' '.join(words))
+    return phrases
+
+
+@functools.lru_cache(maxsize=4096)
+def _get_key_value_features(key: str, value: str) -> Tuple[str, ...]:
+    """Returns the feature names for a key-value pair.
+
+    The same descriptions tend to recur across many transactions, both in the
+    training data and in the entries to be predicted, so this is cached.  The
+    names are also interned, so that the feature dicts of all examples share
+    the same string objects (with their hashes already computed).
+    """
+    return tuple(
+        sys.intern('%s:%s' % (key, phrase))
+        for phrase in _get_value_phrases(value))
+
 
 def get_features(example: PredictionInput) -> Dict[str, bool]:
-    features = collections.defaultdict(lambda: False)  # type: Dict[str, bool]
-    features['account:%s' % example.source_account] = True
+    # Absent features are implicitly false, so only true values are stored.
+    features = {
+        sys.intern('account:%s' % example.source_account): True
+    }  # type: Dict[str, bool]
 
     # For now, skip amount and date.
 
@@ -37,24 +77,29 @@ def get_features(example: PredictionInput) -> Dict[str, bool]:
         if isinstance(values, str):
             values = (values, )
         for value in values:
-            words = []
-            for w in value.split():
-                w = w.strip('-.').lower()
-                if len(w) > 0:
-                    words.append(w)
-            for start_i in range(len(words)):
-                for end_i in range(start_i + 1, len(words) + 1):
-                    features['%s:%s' % (key, ' '.join(
-                        words[start_i:end_i]))] = True
+            for feature in _get_key_value_features(key, value):
+                features[feature] = True
     return features
 
 
+# Names of the (true) features of a training example, in sorted order.
+FeatureNames = Tuple[str, ...]
+
+
 class TrainingExamples(object):
     def __init__(self):
-        self.training_examples = []
+        # Features are stored as sorted tuples of names, which take much less
+        # memory than the dicts returned by `get_features`.
+        self.training_examples = []  # type: List[Tuple[FeatureNames, str]]
+        # Canonical instance of each distinct tuple of feature names.  Many
+        # examples, e.g. those from recurring transactions, have the same
+        # features.
+        self._feature_names = {}  # type: Dict[FeatureNames, FeatureNames]
 
     def add(self, example: PredictionInput, target_account: str):
-        self.training_examples.append((get_features(example), target_account))
+        features = tuple(sorted(get_features(example)))
+        features = self._feature_names.setdefault(features, features)
+        self.training_examples.append((features, target_account))
 
 
 class MockTrainingExamples(object):
@@ -69,6 +114,77 @@ class MockTrainingExamples(object):
 TrainingExamplesInterface = Union[TrainingExamples, MockTrainingExamples]
 
 
+class AccountClassifier(object):
+    """Decision tree classifier that predicts accounts from features.
+
+    Since all feature values are true, each set of features is converted
+    directly to a row of a sparse matrix using a fixed feature index, rather
+    than through a general-purpose `DictVectorizer`.
+    """
+
+    def __init__(self) -> None:
+        import sklearn.tree
+        self._clf = sklearn.tree.DecisionTreeClassifier()
+        self.feature_names = []  # type: List[str]
+        self.feature_index = {}  # type: Dict[str, int]
+        self.labels = []  # type: List[str]
+
+    def __repr__(self):
+        return '<AccountClassifier(%r)>' % self._clf
+
+    def get_feature_matrix(self, featuresets: Sequence[Iterable[str]]):
+        """Returns a sparse matrix with one row per element of `featuresets`.
+
+        Each element is either a dict returned by `get_features`, or the
+        feature names of a training example.  Features not seen during training
+        are ignored.
+        """
+        import numpy as np
+        import scipy.sparse
+        feature_index = self.feature_index
+        indices = []  # type: List[int]
+        indptr = [0]
+        for features in featuresets:
+            indices.extend(
+                sorted(feature_index[feature] for feature in features
+                       if feature in feature_index))
+            indptr.append(len(indices))
+        return scipy.sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32),
+             np.array(indices, dtype=np.int32), np.array(
+                 indptr, dtype=np.int32)),
+            shape=(len(featuresets), len(self.feature_names)))
+
+    def train(self, training_examples: Sequence[Tuple[Iterable[str], str]]
+              ) -> 'AccountClassifier':
+        import numpy as np
+        # Sorted for consistency with `DictVectorizer`, which this replaces.
+        self.feature_names = sorted(
+            set(itertools.chain.from_iterable(
+                features for features, _ in training_examples)))
+        self.feature_index = {
+            feature: i
+            for i, feature in enumerate(self.feature_names)
+        }
+        self.labels = sorted(set(label for _, label in training_examples))
+        label_index = {label: i for i, label in enumerate(self.labels)}
+        X = self.get_feature_matrix(
+            [features for features, _ in training_examples])
+        y = np.array([label_index[label] for _, label in training_examples])
+        self._clf.fit(X, y)
+        return self
+
+    def classify_many(self,
+                      featuresets: Sequence[Iterable[str]]) -> List[str]:
+        if not featuresets:
+            return []
+        labels = self.labels
+        return [
+            labels[i] for i in self._clf.predict(
+                self.get_feature_matrix(featuresets))
+        ]
+
+
 def get_unknown_account_postings(transaction: Transaction) -> List[Posting]:
     return [
         posting for posting in transaction.postings
@@ -25,6 +25,34 @@ def test_get_features():
             }
 
 
+def test_get_features_long_value():
+    date = datetime.date.min
+    amount = Amount.from_string('3 USD')
+    assert training.get_features(
+        training.PredictionInput(
+            date=date,
+            amount=amount,
+            source_account='Assets:Checking',
+            key_value_pairs={
+                'a': 'one Two. three -four five',
+            })) == {
+                'account:Assets:Checking': True,
+                'a:one': True,
+                'a:two': True,
+                'a:three': True,
+                'a:four': True,
+                'a:five': True,
+                'a:one two': True,
+                'a:two three': True,
+                'a:three four': True,
+                'a:four five': True,
+                'a:one two three': True,
+                'a:two three four': True,
+                'a:three four five': True,
+                'a:one two three four five': True,
+            }
+
+
 def test_get_unknown_account_group_numbers():
     entry, = test_util.parse("""
         1900-01-01 * "Narration"
@@ -48,3 +76,32 @@ def test_get_unknown_account_group_numbers():
         'Expenses:FIXME:B',
         'Expenses:FIXME',
     ]
+
+
+def test_account_classifier():
+    classifier = training.AccountClassifier()
+    classifier.train([
+        ({'account:A': True, 'desc:coffee': True}, 'Expenses:Coffee'),
+        ({'account:A': True, 'desc:grocery': True}, 'Expenses:Groceries'),
+        ({'account:B': True, 'desc:coffee': True}, 'Expenses:Coffee'),
+    ])
+    assert classifier.classify_many([
+        {'account:B': True, 'desc:coffee': True},
+        {'account:A': True, 'desc:grocery': True, 'desc:unknown': True},
+    ]) == ['Expenses:Coffee', 'Expenses:Groceries']
+    assert classifier.classify_many([]) == []
+
+
+def test_training_examples_share_features():
+    example = training.PredictionInput(
+        date=datetime.date.min,
+        amount=Amount.from_string('3 USD'),
+        source_account='Assets:Checking',
+        key_value_pairs={'desc': 'Coffee Shop'})
+    training_examples = training.TrainingExamples()
+    training_examples.add(example, 'Expenses:Coffee')
+    training_examples.add(example._replace(amount=Amount.from_string('4 USD')),
+                          'Expenses:Coffee')
+    (features_a, _), (features_b, _) = training_examples.training_examples
+    assert features_a == tuple(sorted(training.get_features(example)))
+    assert features_a is features_b
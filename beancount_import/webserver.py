@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-from typing import Tuple, Optional, List, Dict, Any
+from typing import Tuple, Optional, List, Dict, Any, Iterable, Set
 import argparse
 import binascii
 import datetime
@@ -8,10 +8,11 @@ import time
 import io
 import collections
 import sys
+import threading
 import logging
 import traceback
 import pdb
-import pkg_resources
+import pkgutil
 import json
 import os
 import tempfile
@@ -59,13 +60,16 @@ def json_encode_beancount_entry(x):
     return result
 
 
+# Shared by all formatting calls, since it keeps no state between them.
+_printer = beancount.parser.printer.EntryPrinter()
+
+
 def format_transaction(transaction: Transaction) -> str:
-    printer = beancount.parser.printer.EntryPrinter()
-    return printer(transaction)
+    return _printer(transaction)
 
 
 def format_posting(posting: Posting, indent: str = '  ') -> str:
-    printer = beancount.parser.printer.EntryPrinter()
+    printer = _printer
     flag_account, position_str, weight_str = printer.render_posting_strings(
         posting)
     oss = io.StringIO()
@@ -209,8 +213,10 @@ class StaticHandler(tornado.web.RequestHandler):
         else:
             content_type = 'application/octet-stream'
         self.set_header('Content-Type', content_type)
-        contents = pkg_resources.resource_string(__name__,
-                                                 'frontend_dist/%s' % name)
+        contents = pkgutil.get_data(__name__, 'frontend_dist/%s' % name)
+        if contents is None:
+            # The package loader does not support reading resources.
+            raise tornado.web.HTTPError(404)
         if name == 'app.js':
             contents = contents.replace(
                 self.application.secret_key_pattern.encode(),  # type: ignore
@@ -413,12 +419,20 @@ class GetFileHandler(tornado.web.RequestHandler):
 
 
 class JournalModificationHandler(watchdog.events.FileSystemEventHandler):
-    def __init__(self, application):
+    def __init__(self, application, journal_filenames):
         super(JournalModificationHandler, self).__init__()
         self.application = application
+        self.journal_filenames = journal_filenames
 
     def on_any_event(self, event):
-        self.application.ioloop.add_callback(self.application.check_modification)
+        # The watched directories may contain many other files, e.g. editor
+        # backup files.  Only events for the journal files themselves, or
+        # renames onto them, require checking for modifications.
+        modified_filenames = self.journal_filenames.intersection(
+            (event.src_path, getattr(event, 'dest_path', None)))
+        if not modified_filenames:
+            return
+        self.application.schedule_check_modification(modified_filenames)
 
 
 class Application(tornado.web.Application):
@@ -449,10 +463,19 @@ class Application(tornado.web.Application):
         self.current_state_generation = dict()
         self.generation = 0
         self.skip_ids = None
+        # The editor accounts dict from which `current_state['accounts']` was
+        # last computed, and its size at that time.
+        self.current_accounts_source = None  # type: Optional[Dict[str, Any]]
+        self.current_accounts_count = 0
 
         self.log_status('Initializing')
 
         self.check_modification_observer = None
+        self.check_modification_lock = threading.Lock()
+        # Journal files for which modification events have been received since
+        # the last call to `check_modification`, or `None` if no call is
+        # scheduled.
+        self.check_modification_filenames = None  # type: Optional[Set[str]]
         self.reconciler = reconcile.Reconciler(
             journal_path=args.journal_input,
             ignore_path=args.ignored_journal,
@@ -478,11 +501,32 @@ class Application(tornado.web.Application):
                 except:
                     traceback.print_exc()
 
+    def schedule_check_modification(self, filenames: Iterable[str]):
+        """Schedules a call to `check_modification` for `filenames` on the IO loop.
+
+        This may be called from any thread.  A burst of file system events,
+        such as the several events generated by an atomic write, results in a
+        single check.
+        """
+        with self.check_modification_lock:
+            if self.check_modification_filenames is not None:
+                self.check_modification_filenames.update(filenames)
+                return
+            self.check_modification_filenames = set(filenames)
+        self.ioloop.add_callback(self.check_modification)
+
     def check_modification(self):
+        # Reset before checking, so that a modification made after this point
+        # schedules another check.
+        with self.check_modification_lock:
+            filenames = self.check_modification_filenames
+            self.check_modification_filenames = None
         if self.reconciler.loaded_future.done():
             loaded_reconciler = self.reconciler.loaded_future.result()
+            # Only the files for which events were received need to be
+            # checked.
             modified_filenames = loaded_reconciler.editor.check_any_journal_modification(
-            )
+                filenames)
             if modified_filenames:
                 self._notify_modified_files(list(modified_filenames))
                 self.reconciler.reload_journal()
@@ -519,6 +563,8 @@ class Application(tornado.web.Application):
                 accounts=sorted(loaded_reconciler.editor.accounts.keys()),
                 journal_filenames=sorted(
                     list(loaded_reconciler.editor.journal_filenames)))
+            self.current_accounts_source = loaded_reconciler.editor.accounts
+            self.current_accounts_count = len(loaded_reconciler.editor.accounts)
             self.current_errors = loaded_reconciler.errors
             self.current_invalid = loaded_reconciler.invalid_references
             self.start_check_modification_observer(loaded_reconciler)
@@ -529,10 +575,12 @@ class Application(tornado.web.Application):
 
     def start_check_modification_observer(self, loaded_reconciler):
         if self.check_modification_observer is not None:
-            self.check_modification_observer.unschedule_all()
+            # Stop the previous observer thread rather than leaving it idle.
+            self.check_modification_observer.stop()
 
         self.check_modification_observer = watchdog.observers.Observer()
-        handler = JournalModificationHandler(self)
+        handler = JournalModificationHandler(
+            self, frozenset(loaded_reconciler.editor.journal_filenames))
         journal_paths = set(
             os.path.dirname(filename) for filename in loaded_reconciler.editor.journal_filenames)
 
@@ -557,9 +605,16 @@ class Application(tornado.web.Application):
                            len(loaded_reconciler.uncleared_postings)),
             )
 
-        accounts = sorted(loaded_reconciler.editor.accounts.keys())
-        if accounts != self.current_state['accounts']:
-            kwargs.update(accounts=accounts)
+        # Accounts are only ever added to the editor, so the sorted list needs
+        # to be recomputed only if the number of accounts has changed.
+        editor_accounts = loaded_reconciler.editor.accounts
+        if (self.current_accounts_source is not editor_accounts or
+                self.current_accounts_count != len(editor_accounts)):
+            self.current_accounts_source = editor_accounts
+            self.current_accounts_count = len(editor_accounts)
+            accounts = sorted(editor_accounts.keys())
+            if accounts != self.current_state['accounts']:
+                kwargs.update(accounts=accounts)
 
         self.current_pending = loaded_reconciler.pending_data
         self.current_uncleared = loaded_reconciler.uncleared_postings
@@ -95,6 +95,36 @@ const CompletionMenu = styled.div`
   border-top-right-radius: 5px;
 `;
 
+/**
+ * Checks if the first of `components` is a prefix of some component of
+ * `account`, and each subsequent one is a prefix of a later component.
+ *
+ * Each component is located with a single `indexOf` scan, rather than by
+ * building and running a regular expression for every keystroke.
+ */
+function matchesAccountComponents(account: string, components: string[]) {
+  const first = components[0];
+  let end: number;
+  if (account.startsWith(first)) {
+    end = first.length;
+  } else {
+    const index = account.indexOf(":" + first);
+    if (index === -1) {
+      return false;
+    }
+    end = index + 1 + first.length;
+  }
+  for (let i = 1; i < components.length; ++i) {
+    const component = components[i];
+    const index = account.indexOf(":" + component, end);
+    if (index === -1) {
+      return false;
+    }
+    end = index + 1 + component.length;
+  }
+  return true;
+}
+
 export class AccountInputComponent extends React.PureComponent<
   AccountInputComponentProps,
   AccountInputComponentState
@@ -163,19 +193,36 @@ export class AccountInputComponent extends React.PureComponent<
     );
   };
 
+  // Sorted copy of `props.accounts` and the corresponding lowercase account
+  // names, computed once per `accounts` array rather than on every keystroke.
+  // This is not given an initializer, since `state` is initialized (and calls
+  // `getCompletions`) before any later property initializers run.
+  private sortedAccountsCache?: {
+    source: string[];
+    accounts: string[];
+    lowerCaseAccounts: string[];
+  };
+
+  private getSortedAccounts() {
+    const { accounts } = this.props;
+    let cache = this.sortedAccountsCache;
+    if (cache === undefined || cache.source !== accounts) {
+      const sortedAccounts = accounts.slice().sort();
+      cache = this.sortedAccountsCache = {
+        source: accounts,
+        accounts: sortedAccounts,
+        lowerCaseAccounts: sortedAccounts.map(account => account.toLowerCase())
+      };
+    }
+    return cache;
+  }
+
   private getCompletions(value: string) {
-    value = value.toLowerCase();
-    let pattern = value.replace(/[.\[\]()?\\+\-{}]/g, "\\$&");
-    pattern = pattern.replace(/:/g, ".*:");
-    pattern = "(?:^|.*:)" + pattern;
-    let regexp = new RegExp(pattern);
-    let { accounts } = this.props;
-    accounts.sort();
-    const results = accounts.filter(account =>
-      regexp.test(account.toLowerCase())
+    const components = value.toLowerCase().split(":");
+    const { accounts, lowerCaseAccounts } = this.getSortedAccounts();
+    return accounts.filter((account, i) =>
+      matchesAccountComponents(lowerCaseAccounts[i], components)
     );
-    results.sort();
-    return results;
   }
 
   componentDidMount() {
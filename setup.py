@@ -170,7 +170,6 @@ setuptools.setup(
         'numpy',
         'scipy',
         'scikit-learn~=1.2',
-        'nltk',
         'python-dateutil',
         'atomicwrites>=1.3.0',
         'jsonschema',